@@ -0,0 +1,247 @@
+# Benchmark of the dashboard pipeline on a seeded synthetic final_table loaded into SQLite.
+#
+#   python benchmark.py --sizes 100000 1000000 --output results.json
+#   python benchmark.py --sizes 100000 1000000 --baseline baseline.json
+#
+# Every stage (fetch, date parsing, compaction, derived columns, cube, each visualization's aggregate, each chart render, ...)
+# is timed and its peak traced memory recorded. The results are written as JSON; with --baseline,
+# stages slower or larger than the baseline by more than the thresholds are reported and the
+# exit status is 1.
+import argparse
+import gc
+import json
+import os
+import platform
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import streamlit.logger
+
+import python as dashboard
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Rows written to SQLite per batch while generating a table
+GENERATE_BATCH_ROWS = 1_000_000
+
+# Value sets of the synthetic table
+TITLES = ["Engineer", "Senior Engineer", "Staff", "Senior Staff", "Technique Leader", "Assistant Engineer", "Manager"]
+RATINGS = ["A", "B", "C", "PIP", "S"]
+
+# Share of employees with a second row (a title change), as in the real table
+REPEAT_EMPLOYEE_SHARE = 0.1
+
+# Sidebar filter selections timed against the cube, from broad to narrow
+FILTER_SELECTIONS = {
+    "left": (("left", (1,)),),
+    "two_titles": (("title", ("Manager", "Staff")),),
+    "gender_hire_years": (("sex", ("F",)), ("hire_year", tuple(range(1990, 1996)))),
+    "narrow": (("title", ("Engineer",)), ("sex", ("M",)), ("left", (1,)), ("hire_year", (1987, 1988))),
+}
+
+# Function to generate rows start..start+n of the synthetic final_table (same columns as the real one;
+# dates as ISO strings, last_date NULL for current employees)
+def generate_rows(start, n, seed):
+    rng = np.random.default_rng([seed, start])
+    emp_no = np.arange(10001 + start, 10001 + start + n)
+    hire = pd.Timestamp("1985-01-01") + pd.to_timedelta(rng.integers(0, 15 * 365, n), unit="D")
+    left = rng.random(n) < 0.3
+    last = hire + pd.to_timedelta(rng.integers(200, 14 * 365, n), unit="D")
+    birth = hire - pd.to_timedelta(rng.integers(21 * 365, 40 * 365, n), unit="D")
+    df = pd.DataFrame({
+        "emp_no": emp_no,
+        "title": rng.choice(TITLES, n),
+        "salary": rng.integers(40000, 129493, n),
+        "sex": rng.choice(["M", "F"], n),
+        "left": left.astype(int),
+        "hire_date": hire.strftime("%Y-%m-%d"),
+        "last_date": np.where(left, last.strftime("%Y-%m-%d"), None),
+        "birth_date": birth.strftime("%Y-%m-%d"),
+        "Last_performance_rating": rng.choice(RATINGS, n),
+    })
+    repeats = df[rng.random(n) < REPEAT_EMPLOYEE_SHARE].assign(title=lambda rows: rng.choice(TITLES, len(rows)))
+    return pd.concat([df, repeats]).sort_values("emp_no", kind="stable")
+
+# Function to create the SQLite stand-in for n employees (reused if it already exists)
+def synthetic_database(n, seed, directory):
+    path = os.path.join(directory, f"final_table_{n}_{seed}.db")
+    if os.path.exists(path):
+        return path
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    conn = sqlite3.connect(temp_path)
+    for start in range(0, n, GENERATE_BATCH_ROWS):
+        rows = generate_rows(start, min(GENERATE_BATCH_ROWS, n - start), seed)
+        rows.to_sql(dashboard.TABLE_NAME, conn, if_exists="append", index=False)
+    conn.close()
+    os.replace(temp_path, path)
+    return path
+
+# Function to run one stage; returns its result and records the fastest of the repeats in seconds
+# and the peak traced memory
+def measure(results, stage, function, trace_memory, repeat):
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        gc.collect()
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        value = function()
+        timings.append(time.perf_counter() - started)
+        if trace_memory:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    result = {"seconds": round(min(timings), 4)}
+    if trace_memory:
+        result["peak_mb"] = round(peak / 1024 / 1024, 2)
+    results[stage] = result
+    return value
+
+# Function to time every stage of the pipeline on one synthetic table
+def benchmark_size(path, trace_memory, render, repeat):
+    pool = dashboard.ConnectionPool(lambda: dashboard.connect_to_sqlite(path), 1, 60, 60)
+    query = dashboard.table_query()
+    results = {}
+
+    def measure_stage(stage, function):
+        return measure(results, stage, function, trace_memory, repeat)
+
+    # The table's frames are only kept until the cube is built, as in the dashboard
+    def load_cube():
+        rows = measure_stage("fetch", lambda: dashboard.fetch_data_pooled(pool, query))
+        results["fetch"]["rows"] = len(rows)
+        dates = [column for column, kind in dashboard.TABLE_SCHEMA.items() if kind == "datetime"]
+        parsed = measure_stage("parse_dates", lambda: rows.assign(**{column: dashboard.parse_dates(rows[column]) for column in dates}))
+        # Categoricals and integer downcasts; the dates are already parsed
+        df = measure_stage("compact", lambda: dashboard.compact_table(parsed))
+        results["compact"]["table_mb"] = round(dashboard.frame_size(df) / 1024 / 1024, 2)
+        columns = measure_stage("derived_columns", lambda: dashboard.add_derived_columns(df))
+        return measure_stage("cube", lambda: dashboard.AggregateCube.build(columns))
+
+    cube = load_cube()
+    measure_stage("rollup_plans", cube.prepared)
+    aggregates = {}
+    for name in dashboard.VISUALIZATION_AGGREGATES:
+        aggregates[name] = measure_stage(f"aggregate:{name}", lambda: cube.rollup(name))
+    measure_stage("key_metrics", lambda: dashboard.key_metrics(aggregates))
+    for label, filters in FILTER_SELECTIONS.items():
+        measure_stage(f"filter:{label}", lambda: dashboard.compute_aggregates(cube, filters))
+
+    sql = dashboard.build_aggregates_sql("sqlite")
+    result = measure_stage("sql_aggregates", lambda: dashboard.fetch_data_pooled(pool, sql))
+    measure_stage("split_aggregates", lambda: dashboard.split_aggregates(result))
+    measure_stage("streaming", lambda: dashboard.load_table_streaming(pool, dashboard.streaming_query()))
+
+    if render:
+        for chart_id in dashboard.CHART_BUILDERS:
+            png = measure_stage(f"render:{chart_id}", lambda: dashboard.render_chart_png(chart_id, aggregates))
+            results[f"render:{chart_id}"]["bytes"] = len(png)
+    pool.close()
+    return results
+
+# Peak resident memory of this process so far, in MB (None where unavailable)
+def max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return round(rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024, 1)
+
+# Function to list the stages that got slower or larger than the baseline. Changes below the
+# absolute floors are ignored, so tiny stages do not fail on timer noise.
+def compare(current, baseline, time_threshold, memory_threshold, min_seconds, min_mb):
+    regressions = []
+    for size, stages in current["results"].items():
+        for stage, result in stages.items():
+            base = baseline.get("results", {}).get(size, {}).get(stage)
+            if base is None:
+                continue
+            checks = [("seconds", time_threshold, min_seconds), ("peak_mb", memory_threshold, min_mb)]
+            for metric, threshold, floor in checks:
+                if metric not in result or metric not in base:
+                    continue
+                if result[metric] > base[metric] * (1 + threshold) and result[metric] - base[metric] > floor:
+                    regressions.append((size, stage, metric, base[metric], result[metric]))
+    return regressions
+
+# Function to print one size's stage timings, with the change against the baseline if there is one
+def print_results(size, stages, baseline):
+    print(f"\n{int(size):,} employees")
+    for stage, result in stages.items():
+        line = f"  {stage:<42} {result['seconds']:>9.4f}s"
+        if "peak_mb" in result:
+            line += f" {result['peak_mb']:>9.1f}MB"
+        base = (baseline or {}).get("results", {}).get(size, {}).get(stage)
+        if base and base["seconds"] > 0:
+            line += f"   {(result['seconds'] / base['seconds'] - 1) * 100:+6.1f}% time"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard pipeline on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="employee counts to benchmark (e.g. 100000 1000000 10000000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the synthetic data")
+    parser.add_argument("--data-dir", default=os.path.join("benchmarks", "data"), help="where the synthetic SQLite databases are kept")
+    parser.add_argument("--output", help="write the results JSON to this file")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="allowed relative slowdown per stage (0.25 = 25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25, help="allowed relative growth of peak memory per stage")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--min-mb", type=float, default=5.0, help="ignore memory growth smaller than this many MB")
+    parser.add_argument("--repeat", type=int, default=1, help="run each stage this many times and keep the fastest")
+    parser.add_argument("--no-memory", action="store_true", help="skip memory tracing (faster, timings without tracing overhead)")
+    parser.add_argument("--no-render", action="store_true", help="skip the chart render stages")
+    args = parser.parse_args()
+
+    streamlit.logger.set_log_level("error")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    current = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": args.seed,
+        "memory_traced": not args.no_memory,
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        path = synthetic_database(size, args.seed, args.data_dir)
+        stages = benchmark_size(path, not args.no_memory, not args.no_render, args.repeat)
+        current["results"][str(size)] = stages
+        print_results(str(size), stages, baseline)
+    current["max_rss_mb"] = max_rss_mb()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if baseline is not None:
+        if baseline.get("memory_traced") != current["memory_traced"]:
+            print("Warning: the baseline was measured with memory tracing set differently; timings are not comparable.")
+        regressions = compare(current, baseline, args.time_threshold, args.memory_threshold, args.min_seconds, args.min_mb)
+        for size, stage, metric, before, after in regressions:
+            print(f"REGRESSION {int(size):,} {stage} {metric}: {before} -> {after}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,2506 @@
+import argparse
+import base64
+import html
+import importlib
+import io
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+
 import streamlit as st
 import pandas as pd
+import numpy as np
 import pyodbc
-import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.figure import Figure
 
-# Function to connect to SQL Server using Windows Authentication
-def connect_to_sql_server(server, database):
-    try:
-        conn = pyodbc.connect(
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server};"
-            f"DATABASE={database};"
-            "Trusted_Connection=yes;"  # Use Windows Authentication
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # local snapshots are optional
+    pa = None
+
+try:
+    import psutil
+except ImportError:  # memory deltas in the performance panel are optional
+    psutil = None
+
+# Query result cache settings (override with environment variables)
+QUERY_CACHE_TTL_SECONDS = int(os.environ.get("DASHBOARD_CACHE_TTL", "600"))
+QUERY_CACHE_MAX_BYTES = int(os.environ.get("DASHBOARD_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Rendered chart cache settings; entries are keyed by data version, so the TTL only bounds idle memory
+RENDER_CACHE_TTL_SECONDS = int(os.environ.get("DASHBOARD_RENDER_CACHE_TTL", "86400"))
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("DASHBOARD_RENDER_CACHE_MAX_MB", "128")) * 1024 * 1024
+
+# Worker processes that render charts of closed sections ahead of time
+RENDER_WORKERS = int(os.environ.get("DASHBOARD_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Connection pool settings: connections per server/database, idle timeout and checkout wait
+POOL_MAX_SIZE = int(os.environ.get("DASHBOARD_POOL_SIZE", "5"))
+POOL_IDLE_TIMEOUT_SECONDS = int(os.environ.get("DASHBOARD_POOL_IDLE_TIMEOUT", "300"))
+POOL_CHECKOUT_TIMEOUT_SECONDS = int(os.environ.get("DASHBOARD_POOL_CHECKOUT_TIMEOUT", "30"))
+
+# Incremental refresh settings: optional rowversion column and full resync interval (catches deletes)
+INCREMENTAL_ROWVERSION_COLUMN = os.environ.get("DASHBOARD_ROWVERSION_COLUMN") or None
+INCREMENTAL_FULL_RESYNC_SECONDS = int(os.environ.get("DASHBOARD_FULL_RESYNC", "86400"))
+
+# Streaming ingestion: rows read per chunk when the table is aggregated chunk by chunk, and
+# partial cubes merged into the running cube at a time
+STREAM_CHUNK_ROWS = int(os.environ.get("DASHBOARD_STREAM_CHUNK_ROWS", "50000"))
+STREAM_MERGE_BATCH = int(os.environ.get("DASHBOARD_STREAM_MERGE_BATCH", "16"))
+
+# Background refresh: seconds between reloads of the table shown on the page (0 turns it off),
+# how long a table nobody views keeps being refreshed, and the data age shown as stale
+REFRESH_INTERVAL_SECONDS = int(os.environ.get("DASHBOARD_REFRESH_INTERVAL", "300"))
+REFRESH_IDLE_SECONDS = int(os.environ.get("DASHBOARD_REFRESH_IDLE", "3600"))
+STALE_AFTER_SECONDS = int(os.environ.get("DASHBOARD_STALE_AFTER", "900"))
+
+# Performance log: one JSON line per rerun on stderr (set DASHBOARD_PERF_LOG=0 to turn off)
+PERFORMANCE_LOG = os.environ.get("DASHBOARD_PERF_LOG", "1") != "0"
+
+# Local snapshot settings: directory and age after which a snapshot is refreshed from the database
+SNAPSHOT_DIR = os.environ.get("DASHBOARD_SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_MAX_AGE_SECONDS = int(os.environ.get("DASHBOARD_SNAPSHOT_MAX_AGE", "3600"))
+
+# Shared dataset mode (DASHBOARD_SHARED_DATA=1, requires pyarrow): every server process on this machine
+# maps one published copy of the table's aggregate cube instead of building its own. Versions are kept
+# in shared memory where the OS has it; a process loading a new version holds the publish lock for at
+# most the timeout.
+SHARED_DATASET = os.environ.get("DASHBOARD_SHARED_DATA", "0") == "1"
+SHARED_DATA_DIR = os.environ.get("DASHBOARD_SHARED_DIR") or os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "employee_dashboard"
+)
+SHARED_PUBLISH_TIMEOUT_SECONDS = int(os.environ.get("DASHBOARD_SHARED_PUBLISH_TIMEOUT", "600"))
+
+# Table the dashboard reads from
+TABLE_NAME = "final_table"  # Replace with your table name
+
+# Columns the dashboard reads from the table and how they are held in memory: low-cardinality
+# strings as categoricals, dates as datetime64 and whole numbers in the smallest integer type
+# that fits (columns with missing values stay float64)
+TABLE_SCHEMA = {
+    "emp_no": "integer",
+    "title": "category",
+    "salary": "integer",
+    "sex": "category",
+    "left": "integer",
+    "hire_date": "datetime",
+    "last_date": "datetime",
+    "birth_date": "datetime",
+    "Last_performance_rating": "category",
+}
+
+# Resident memory of this process in bytes (None without psutil)
+def process_memory():
+    return psutil.Process().memory_info().rss if psutil is not None else None
+
+# Timings of one rerun: wall time, rows and memory change summed per stage
+class RerunProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = OrderedDict()
+
+    def add(self, name, seconds, rows, memory_delta):
+        stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "rows": None, "memory_delta_mb": None})
+        stage["calls"] += 1
+        stage["seconds"] += seconds
+        if rows is not None:
+            stage["rows"] = (stage["rows"] or 0) + rows
+        if memory_delta is not None:
+            stage["memory_delta_mb"] = (stage["memory_delta_mb"] or 0) + memory_delta / 1024 / 1024
+
+    def total_seconds(self):
+        return time.perf_counter() - self.started
+
+    # Stages as a table for the performance panel
+    def table(self):
+        return pd.DataFrame(
+            [{"stage": name, **stage} for name, stage in self.stages.items()],
+            columns=["stage", "calls", "seconds", "rows", "memory_delta_mb"],
         )
+
+    # The rerun as one structured log record
+    def record(self):
+        stages = []
+        for name, stage in self.stages.items():
+            stages.append({"stage": name, **{key: round(value, 4) if isinstance(value, float) else value for key, value in stage.items()}})
+        return {
+            "event": "rerun",
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total_seconds": round(self.total_seconds(), 4),
+            "stages": stages,
+        }
+
+# Profile of the rerun running on each script thread, shared by every execution of this file
+@st.cache_resource
+def get_profile_state():
+    return threading.local()
+
+# Function to time one step of the current rerun. The caller may set record["rows"] once the
+# number of rows processed is known. Does nothing outside a profiled rerun.
+@contextmanager
+def record_stage(name, rows=None):
+    record = {"rows": rows}
+    profile = getattr(get_profile_state(), "profile", None)
+    if profile is None:
+        yield record
+        return
+    memory_before = process_memory()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - started
+        memory_delta = None if memory_before is None else process_memory() - memory_before
+        profile.add(name, seconds, record["rows"], memory_delta)
+
+# Logger for the per-rerun JSON lines: bare messages on stderr, so log tooling can parse each line
+def performance_logger():
+    logger = logging.getLogger("dashboard.performance")
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+# Function to profile one rerun: the stages recorded inside it are collected and logged as one JSON line
+@contextmanager
+def profile_rerun():
+    state = get_profile_state()
+    profile = RerunProfile()
+    state.profile = profile
+    try:
+        yield profile
+    finally:
+        state.profile = None
+        if PERFORMANCE_LOG:
+            performance_logger().info(json.dumps(profile.record()))
+
+# Function to connect to SQL Server using Windows Authentication (raises on failure)
+def connect_to_sql_server(server, database):
+    conn = pyodbc.connect(
+        f"DRIVER={{ODBC Driver 17 for SQL Server}};"
+        f"SERVER={server};"
+        f"DATABASE={database};"
+        "Trusted_Connection=yes;"  # Use Windows Authentication
+    )
+    return conn
+
+# Function to connect to a local SQLite database file (for running without SQL Server)
+def connect_to_sqlite(database):
+    return sqlite3.connect(database, check_same_thread=False)
+
+# Connection factory for a server name; the server name "sqlite" opens the database as a SQLite file
+def connection_factory(server, database):
+    if server.lower() == "sqlite":
+        return lambda: connect_to_sqlite(database)
+    return lambda: connect_to_sql_server(server, database)
+
+# Bounded pool of DB-API connections shared by all sessions. Connections are checked with a
+# cheap query on checkout and reopened if they were dropped; idle ones are closed after a timeout,
+# by a background thread that runs while the pool has idle connections.
+class ConnectionPool:
+    def __init__(self, factory, max_size, idle_timeout, checkout_timeout):
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self._idle = []
+        self._open = 0
+        self._reaper = None
+        self._cond = threading.Condition()
+
+    # The connection goes back to the pool however the block exits, including Streamlit's
+    # stop/rerun exceptions (BaseException); after an error it is closed if no longer alive
+    @contextmanager
+    def connection(self):
+        conn = self.checkout()
+        failed = True
+        try:
+            yield conn
+            failed = False
+        finally:
+            self.checkin(conn, broken=failed and not self.is_alive(conn))
+
+    def checkout(self):
+        deadline = time.time() + self.checkout_timeout
+        with self._cond:
+            while True:
+                self._close_expired()
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    conn = None
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"No database connection free after {self.checkout_timeout}s")
+                self._cond.wait(remaining)
+
+        if conn is not None and not self.is_alive(conn):
+            self._close(conn)
+            conn = None
+        if conn is None:
+            try:
+                conn = self.factory()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
         return conn
+
+    def checkin(self, conn, broken=False):
+        if broken:
+            self._close(conn)
+        with self._cond:
+            if broken:
+                self._open -= 1
+            else:
+                self._idle.append((conn, time.time()))
+                if self._reaper is None:
+                    self._reaper = threading.Thread(target=self._reap, name="dashboard-pool-reaper", daemon=True)
+                    self._reaper.start()
+            self._close_expired()
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            for conn, last_used in self._idle:
+                self._close(conn)
+            self._open -= len(self._idle)
+            self._idle = []
+
+    def _close_expired(self):
+        now = time.time()
+        expired = [item for item in self._idle if now - item[1] >= self.idle_timeout]
+        for item in expired:
+            self._idle.remove(item)
+            self._close(item[0])
+            self._open -= 1
+
+    # Closes idle connections as they expire when no session checks one out or in. It sleeps rather
+    # than waiting on the condition, so it never takes a notify meant for a waiting checkout.
+    def _reap(self):
+        while True:
+            with self._cond:
+                self._close_expired()
+                if not self._idle:
+                    self._reaper = None
+                    return
+                wait = min(last_used for conn, last_used in self._idle) + self.idle_timeout - time.time()
+            time.sleep(max(wait, 0))
+
+    def is_alive(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+# One connection pool per server and database for the whole server process
+@st.cache_resource
+def get_connection_pool(server, database):
+    return ConnectionPool(
+        connection_factory(server, database),
+        POOL_MAX_SIZE,
+        POOL_IDLE_TIMEOUT_SECONDS,
+        POOL_CHECKOUT_TIMEOUT_SECONDS,
+    )
+
+# Function to run a query; timed as the "query" stage (the server's work until rows can be fetched)
+def execute_query(conn, query, params=None):
+    with record_stage("query"):
+        cursor = conn.cursor()
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+    return cursor
+
+# Function to fetch the rows of an executed query as a DataFrame (all of them, or at most size);
+# timed as the "deserialize" stage (transferring the rows and converting them to columns)
+def fetch_frame(cursor, size=None):
+    with record_stage("deserialize") as record:
+        rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+        df = pd.DataFrame.from_records(rows, columns=[column[0] for column in cursor.description], coerce_float=True)
+        record["rows"] = len(df)
+    return df
+
+# Function to fetch data from SQL Server
+def fetch_data(conn, query, params=None):
+    try:
+        with closing(execute_query(conn, query, params)) as cursor:
+            return fetch_frame(cursor)
+    except Exception as e:
+        st.error(f"Error fetching data: {e}")
+        return None
+
+# Function to fetch data on a connection borrowed from the pool
+def fetch_data_pooled(pool, query, params=None):
+    try:
+        with record_stage("connect"):
+            conn = pool.checkout()
     except Exception as e:
         st.error(f"Error connecting to SQL Server: {e}")
-        st.error("Please verify the server name, database name, and your permissions.")
         return None
+    df = None
+    try:
+        df = fetch_data(conn, query, params)
+    finally:
+        pool.checkin(conn, broken=df is None and not pool.is_alive(conn))
+    return df
 
-# Function to fetch data from SQL Server
-def fetch_data(conn, query):
+# Process-unique version numbers for cache entries
+ENTRY_VERSIONS = itertools.count(1)
+
+# A cached query result together with its size, fetch time and loader bookkeeping.
+# The size includes the values derived from the result.
+class CacheEntry:
+    def __init__(self, value, size, fetched_at, expires_at, info):
+        self.version = next(ENTRY_VERSIONS)
+        # Cache key, set when the entry is put in a cache
+        self.key = None
+        self.value = value
+        self.size = size
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self.info = info
+        # Set while the entry is in a cache, which then updates the size (see QueryCache._grown)
+        self.on_grow = None
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    # Value computed from this entry once and kept for as long as the entry lives;
+    # sizeof(value) bytes (value_size by default) are added to the entry's size
+    def derived(self, name, build, sizeof=None):
+        with self._lock:
+            if name not in self._derived:
+                value = build(self.value)
+                self._derived[name] = value
+                self.grow((sizeof or value_size)(value))
+            return self._derived[name]
+
+    def grow(self, size):
+        on_grow = self.on_grow
+        if on_grow is None:
+            self.size += size
+        else:
+            on_grow(self, size)
+
+# Process-wide LRU cache with a TTL and a memory cap, shared by all sessions
+class QueryCache:
+    def __init__(self, ttl_seconds, max_bytes):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Per-key load locks as [lock, sessions using it]; dropped when the last one is done
+        self._key_locks = {}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    # Entry for a key even if it has expired (expired entries stay until evicted or replaced)
+    def peek(self, key):
+        with self._lock:
+            return self._entries.get(key)
+
+    # prepare(entry) runs before the entry replaces the previous one, so readers only ever see
+    # a complete entry: the old one until the swap, the prepared new one after it
+    def put(self, key, value, size, info=None, prepare=None):
+        now = time.time()
+        info = info or {}
+        entry = CacheEntry(value, size, info.get("fetched_at", now), now + self.ttl_seconds, info)
+        if prepare is not None:
+            prepare(entry)
+        with self._lock:
+            self._insert(key, entry)
+        return entry
+
+    # Function to keep an entry whose reload returned the same data: it gets the reload's fetch
+    # time and a new expiry but keeps its version, so nothing derived from it is rebuilt
+    def renew(self, key, entry, info=None):
+        now = time.time()
+        info = info or {}
+        with self._lock:
+            entry.fetched_at = info.get("fetched_at", now)
+            entry.expires_at = now + self.ttl_seconds
+            entry.info = {**entry.info, **info}
+            if self._entries.get(key) is entry:
+                self._entries.move_to_end(key)
+            else:
+                self._insert(key, entry)
+        return entry
+
+    # Only one session loads a missing key; the others wait and reuse its result.
+    # The loader gets the previous (possibly expired) entry and returns (value, info).
+    # With stale_ok an expired entry is returned as is (something else refreshes it).
+    def get_or_load(self, key, loader, sizeof, force=False, prepare=None, stale_ok=False):
+        entry = None if force else self.get(key) or (self.peek(key) if stale_ok else None)
+        if entry is not None:
+            return entry
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+        try:
+            with key_lock[0]:
+                entry = None if force else self.get(key)
+                if entry is not None:
+                    return entry
+                previous = self.peek(key)
+                value, info = loader(previous)
+                if value is None:
+                    return None
+                if previous is not None and same_content(previous, value, info):
+                    return self.renew(key, previous, info)
+                return self.put(key, value, sizeof(value), info, prepare)
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if key_lock[1] == 0:
+                    del self._key_locks[key]
+
+    def invalidate(self, predicate):
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._remove(key)
+
+    def clear(self):
+        self.invalidate(lambda key: True)
+
+    def _insert(self, key, entry):
+        if key in self._entries:
+            self._remove(key)
+        entry.key = key
+        # Results larger than the whole cache are returned but not kept
+        if entry.size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self.total_bytes += entry.size
+        entry.on_grow = lambda grown, size: self._grown(key, grown, size)
+        self._evict()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        entry.on_grow = None
+        self.total_bytes -= entry.size
+
+    # Least recently used entries are dropped until the cache fits its cap again
+    def _evict(self):
+        while self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    # Values derived from a cached entry count towards the cap like the entry itself
+    def _grown(self, key, entry, size):
+        with self._lock:
+            entry.size += size
+            if self._entries.get(key) is entry:
+                self.total_bytes += size
+                self._evict()
+
+# Single query cache for the whole server process
+@st.cache_resource
+def get_query_cache():
+    return QueryCache(QUERY_CACHE_TTL_SECONDS, QUERY_CACHE_MAX_BYTES)
+
+# Memory used by a cached DataFrame
+def frame_size(df):
+    return int(df.memory_usage(deep=True).sum())
+
+# Memory used by a value derived from a cache entry: frames, arrays, cubes, bitmap indexes and
+# containers of them (anything else is not counted)
+def value_size(value):
+    if isinstance(value, pd.DataFrame):
+        return frame_size(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (AggregateCube, BitmapIndex)):
+        return value.size()
+    if isinstance(value, dict):
+        return sum(value_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(value_size(item) for item in value)
+    return 0
+
+# Order-independent hash of a table's or a cube's contents (None for other values)
+def content_hash(value):
+    if isinstance(value, AggregateCube):
+        frames = [value.groups, *value.values.values()]
+    elif isinstance(value, pd.DataFrame):
+        frames = [value]
+    else:
+        return None
+    return sum(int(pd.util.hash_pandas_object(frame, index=False).sum()) for frame in frames) % (1 << 64)
+
+# Whether a reloaded value holds the same data as a cache entry: the same object (an incremental
+# load without changes) or the same contents. The hashes are kept in the entry's and the value's
+# info, so each is computed once. A value mapped from a file (info has its path) must replace the
+# entry, so its old file can be released.
+def same_content(entry, value, info):
+    if value is entry.value:
+        return True
+    if info.get("path"):
+        return False
+    if "content_hash" not in info:
+        info["content_hash"] = content_hash(value)
+    new_hash = info["content_hash"]
+    if new_hash is None:
+        return False
+    if "content_hash" not in entry.info:
+        entry.info["content_hash"] = content_hash(entry.value)
+    return new_hash == entry.info["content_hash"]
+
+# Function to fetch data through the shared cache, keyed by server, database and query.
+# Returns the cache entry; its frame is shared, so callers must not modify it.
+def fetch_data_cached(pool, server, database, query):
+    return get_query_cache().get_or_load(
+        (server, database, query),
+        lambda previous: (fetch_data_pooled(pool, query), {}),
+        frame_size,
+    )
+
+# Function to drop every cached result for one server and database
+def refresh_cached_data(server, database):
+    get_query_cache().invalidate(lambda key: key[:2] == (server, database))
+
+# Columns selected from the table: the schema's, plus the rowversion column for incremental refresh
+def table_columns():
+    columns = list(TABLE_SCHEMA)
+    if INCREMENTAL_ROWVERSION_COLUMN:
+        columns.append(INCREMENTAL_ROWVERSION_COLUMN)
+    return columns
+
+# Query for the dashboard table, selecting only the columns it uses
+def table_query(table=TABLE_NAME):
+    return f"SELECT {', '.join(f'[{column}]' for column in table_columns())} FROM {table}"
+
+# Function to parse a column of ISO date strings (unparseable values become NaT)
+def parse_dates(values):
+    return pd.to_datetime(values, errors="coerce", format="ISO8601")
+
+# Function to convert a table to the schema's compact dtypes. Columns outside table_columns()
+# are dropped; columns that are already compact are kept as they are.
+def compact_table(df):
+    compact = pd.DataFrame(index=df.index)
+    for column in table_columns():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        kind = TABLE_SCHEMA.get(column)
+        if kind == "category" and not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype("category")
+        elif kind == "datetime" and not pd.api.types.is_datetime64_any_dtype(values):
+            values = parse_dates(values)
+        elif kind == "integer":
+            values = pd.to_numeric(values, downcast="integer")
+        compact[column] = values
+    return compact
+
+# Function to fetch table rows on a pooled connection, in the compact schema
+def fetch_table_rows(pool, query, params=None):
+    df = fetch_data_pooled(pool, query, params)
+    if df is None:
+        return None
+    with record_stage("compact", rows=len(df)):
+        return compact_table(df)
+
+# Plain Python value of a pandas/numpy scalar, usable as a query parameter. Dates are passed as
+# ISO text ("YYYY-MM-DD" when there is no time of day), the form SQLite stores them in and one
+# SQL Server converts implicitly, so a date column compares by date rather than as text
+def to_query_param(value):
+    if isinstance(value, pd.Timestamp):
+        return value.date().isoformat() if value == value.normalize() else value.isoformat(sep=" ")
+    return value.item() if isinstance(value, np.generic) else value
+
+# High-water mark of a loaded table: the rowversion column, or max emp_no, hire_date and last_date
+def table_watermark(df):
+    columns = [INCREMENTAL_ROWVERSION_COLUMN] if INCREMENTAL_ROWVERSION_COLUMN else ["emp_no", "hire_date", "last_date"]
+    watermark = {}
+    for column in columns:
+        if column in df.columns and df[column].notna().any():
+            watermark[column] = to_query_param(df[column].dropna().max())
+    return watermark
+
+# Query for every row of employees that were added or changed after the watermark.
+# Dates compare with >= because they only have day granularity.
+def build_delta_query(watermark, table=TABLE_NAME):
+    conditions = []
+    for column in watermark:
+        op = ">=" if column in ("hire_date", "last_date") else ">"
+        conditions.append(f"[{column}] {op} ?")
+    changed = f"SELECT [emp_no] FROM {table} WHERE " + " OR ".join(conditions)
+    return f"{table_query(table)} WHERE [emp_no] IN ({changed})", list(watermark.values())
+
+# Function to bring a previously loaded table up to date: fetch only the changed rows and
+# merge them by emp_no, falling back to a full reload on first use and every full-resync interval
+def load_table_incremental(pool, query, previous):
+    now = time.time()
+    if (
+        previous is None
+        or not previous.info.get("watermark")
+        or now - previous.info.get("full_sync_at", 0) >= INCREMENTAL_FULL_RESYNC_SECONDS
+    ):
+        df = fetch_table_rows(pool, query)
+        if df is None:
+            return None, {}
+        return df, {"watermark": table_watermark(df), "full_sync_at": now, "delta_rows": len(df)}
+
+    delta_query, params = build_delta_query(previous.info["watermark"])
+    delta = fetch_table_rows(pool, delta_query, params)
+    if delta is None:
+        return None, {}
+    df = previous.value
+    if len(delta):
+        # Categories of the two parts can differ, so the merged table is made compact again
+        df = compact_table(pd.concat([df[~df["emp_no"].isin(delta["emp_no"])], delta], ignore_index=True))
+    return df, {"watermark": table_watermark(df), "full_sync_at": previous.info["full_sync_at"], "delta_rows": len(delta)}
+
+# File-name-safe name of one server, database and table
+def dataset_name(server, database):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{server}_{database}_{TABLE_NAME}")
+
+# Default snapshot file for one server, database and table
+def snapshot_path(server, database):
+    return os.path.join(SNAPSHOT_DIR, f"{dataset_name(server, database)}.arrow")
+
+# Function to write an Arrow table as an IPC file; written to a temporary file and renamed into place
+def write_arrow_file(table, path):
+    temp_path = f"{path}.tmp"
+    with pa.OSFile(temp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+# Function to write named Arrow tables into one file that read_arrow_bundle maps back without copying:
+# each table as an Arrow IPC file at an 8-byte aligned offset, then a JSON directory of their offsets
+# and lengths (with the given metadata), then the directory's length in 8 bytes. Written to a
+# temporary file and renamed into place.
+def write_arrow_bundle(tables, metadata, path):
+    temp_path = f"{path}.tmp"
+    directory = {"tables": {}, "metadata": metadata}
+    with pa.OSFile(temp_path, "wb") as sink:
+        for name, table in tables.items():
+            buffer = pa.BufferOutputStream()
+            with pa.ipc.new_file(buffer, table.schema) as writer:
+                writer.write_table(table)
+            buffer = buffer.getvalue()
+            directory["tables"][name] = [sink.tell(), buffer.size]
+            sink.write(buffer)
+            sink.write(b"\0" * (-sink.tell() % 8))
+        footer = json.dumps(directory).encode()
+        sink.write(footer)
+        sink.write(len(footer).to_bytes(8, "little"))
+    os.replace(temp_path, path)
+
+# Function to map a file written by write_arrow_bundle read-only; returns its tables (views of the
+# mapped file) and its metadata
+def read_arrow_bundle(path):
+    source = pa.memory_map(path)
+    size = source.size()
+    footer_length = int.from_bytes(source.read_at(8, size - 8), "little")
+    directory = json.loads(source.read_at(footer_length, size - 8 - footer_length))
+    tables = {}
+    for name, (offset, length) in directory["tables"].items():
+        source.seek(offset)
+        tables[name] = pa.ipc.open_file(source.read_buffer(length)).read_all()
+    return tables, directory["metadata"]
+
+# Function to save a table as an Arrow IPC file (Parquet if the name ends in .parquet),
+# with the fetch time in the schema metadata; written to a temporary file and renamed into place.
+# The Arrow file has the layout of shared_arrow_table, so read_snapshot can map it without copying.
+def write_snapshot(df, path, fetched_at):
+    if path.endswith(".parquet"):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    else:
+        table = shared_arrow_table(df)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"dashboard.fetched_at"] = str(fetched_at).encode()
+    table = table.replace_schema_metadata(metadata)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".parquet"):
+        temp_path = f"{path}.tmp"
+        pq.write_table(table, temp_path)
+        os.replace(temp_path, path)
+    else:
+        write_arrow_file(table, path)
+
+# Function to load a snapshot; returns the table and its fetch time. An Arrow file is memory-mapped
+# and its columns stay views of the file; a Parquet file is decoded into memory.
+def read_snapshot(path):
+    if pa is None or not os.path.exists(path):
+        return None, None
     try:
-        df = pd.read_sql(query, conn)
-        return df
+        if path.endswith(".parquet"):
+            table = pq.read_table(path, memory_map=True)
+            df = compact_table(table.to_pandas())
+        else:
+            table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+            df = table.to_pandas(split_blocks=True)
     except Exception as e:
-        st.error(f"Error fetching data: {e}")
+        st.warning(f"Could not read snapshot {path}: {e}")
+        return None, None
+    # A snapshot saved with other columns (another rowversion setting) is converted
+    if list(df.columns) != table_columns():
+        df = compact_table(df)
+    fetched_at = (table.schema.metadata or {}).get(b"dashboard.fetched_at")
+    fetched_at = float(fetched_at) if fetched_at else os.path.getmtime(path)
+    return df, fetched_at
+
+# Function to serve a cold cache from the local snapshot and save every database load to it.
+# A fresh snapshot is used as is; a stale one is handed to the loader (incremental loads start from it).
+def load_with_snapshot(path, loader, force, previous):
+    if previous is None:
+        df, fetched_at = read_snapshot(path)
+        if df is not None:
+            info = {"fetched_at": fetched_at, "source": "snapshot", "watermark": table_watermark(df), "full_sync_at": fetched_at}
+            if not force and time.time() - fetched_at < SNAPSHOT_MAX_AGE_SECONDS:
+                return df, info
+            previous = CacheEntry(df, frame_size(df), fetched_at, fetched_at, info)
+    df, info = loader(previous)
+    # A load that found nothing new (the previous table, or the same contents) is already saved
+    if df is not None and not (previous is not None and same_content(previous, df, info)):
+        try:
+            write_snapshot(df, path, time.time())
+        except OSError as e:
+            st.warning(f"Could not write snapshot {path}: {e}")
+    return df, info
+
+# Function to fetch the dashboard table's cache entry, optionally refreshing it
+# incrementally and keeping a local snapshot for cold starts
+def fetch_table(pool, server, database, incremental=False, snapshot_file=None, force=False, prepare=None, stale_ok=False):
+    query = table_query()
+    if incremental:
+        loader = lambda previous: load_table_incremental(pool, query, previous)
+    else:
+        loader = lambda previous: (fetch_table_rows(pool, query), {})
+    if snapshot_file:
+        table_loader = loader
+        loader = lambda previous: load_with_snapshot(snapshot_file, table_loader, force, previous)
+    return get_query_cache().get_or_load((server, database, query), loader, frame_size, force, prepare, stale_ok)
+
+# Function to load a snapshot file's cache entry on its own (no database), reloaded when the file changes
+def fetch_snapshot_file(path, force=False):
+    if not os.path.exists(path):
         return None
+    def load(previous):
+        df, fetched_at = read_snapshot(path)
+        return df, {"fetched_at": fetched_at, "source": "snapshot"}
+
+    return get_query_cache().get_or_load(("snapshot", path, os.path.getmtime(path)), load, frame_size, force=force)
+
+# Whether a process is running (assumed so on Windows without psutil, where signal 0 would kill it)
+def process_alive(pid):
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+# Function to convert a frame to an Arrow table that pandas can map back without copying: dates
+# keep NaT and floats keep NaN as values instead of becoming Arrow nulls (which pandas fills in a copy)
+def shared_arrow_table(df):
+    arrays = []
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            missing = codes < 0
+            indices = pa.array(codes, mask=missing if missing.any() else None)
+            arrays.append(pa.DictionaryArray.from_arrays(indices, pa.array(values.cat.categories.to_numpy())))
+        elif pd.api.types.is_datetime64_dtype(values.dtype):
+            unit = np.datetime_data(values.dtype)[0]
+            arrays.append(pa.array(values.to_numpy().view("int64")).view(pa.timestamp(unit)))
+        else:
+            arrays.append(pa.array(values.to_numpy()))
+    return pa.table(arrays, names=list(df.columns))
+
+# Versions of one table shared by every dashboard process on this machine. A loader builds the
+# table's aggregate cube (with its row indexes and rollup plans), publishes it as an Arrow bundle
+# file and points <name>.current at it; processes map the current file read-only, so the cube's
+# pages are shared rather than built and held by each process. Each process marks the version it
+# uses with a <version>.<pid>.ref file; versions that are no longer current are deleted once no
+# running process marks them.
+class SharedDataset:
+    def __init__(self, directory, name):
+        self.directory = directory
+        self.name = name
+        self.pointer = os.path.join(directory, f"{name}.current")
+        self.lock_path = os.path.join(directory, f"{name}.lock")
+        self._attached = None
+        self._lock = threading.Lock()
+
+    # Current version's pointer ({"file", "fetched_at", "content_hash"}), or None before the first publish
+    def _read_pointer(self):
+        try:
+            with open(self.pointer) as f:
+                pointer = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # A version in another format (an older release's table file) is loaded again
+        if not pointer["file"].endswith(".cube") or not os.path.exists(os.path.join(self.directory, pointer["file"])):
+            return None
+        return pointer
+
+    # Current version as (path, fetch time), or (None, None) before the first publish
+    def current(self):
+        pointer = self._read_pointer()
+        if pointer is None:
+            return None, None
+        return os.path.join(self.directory, pointer["file"]), pointer["fetched_at"]
+
+    # Function to publish the cube of a frame (with derived columns) as the new current version;
+    # returns its path. A frame with the contents of the current version keeps its file (processes
+    # need not map it again) and only moves its fetch time forward.
+    def publish(self, df, fetched_at):
+        os.makedirs(self.directory, exist_ok=True)
+        digest = content_hash(df)
+        pointer = self._read_pointer()
+        if pointer is not None and pointer.get("content_hash") == digest:
+            file = pointer["file"]
+        else:
+            file = f"{self.name}.{time.time_ns()}.cube"
+            write_arrow_bundle(*AggregateCube.build(df).to_tables(), os.path.join(self.directory, file))
+        temp_pointer = f"{self.pointer}.{os.getpid()}.tmp"
+        with open(temp_pointer, "w") as f:
+            json.dump({"file": file, "fetched_at": fetched_at, "content_hash": digest}, f)
+        os.replace(temp_pointer, self.pointer)
+        self.collect()
+        return os.path.join(self.directory, file)
+
+    # Function to map a version read-only; returns its cube (its arrays are views of the mapped
+    # file) and moves this process's mark from the version it used before to this one. The mark is
+    # made before mapping, so a collect that runs from then on keeps the file; if one deleted it
+    # just before, FileNotFoundError is raised (the pointer has moved on by then).
+    def attach(self, path):
+        ref = f"{path}.{os.getpid()}.ref"
+        open(ref, "w").close()
+        try:
+            cube = AggregateCube.from_tables(*read_arrow_bundle(path))
+        except FileNotFoundError:
+            with self._lock:
+                if path != self._attached:
+                    os.remove(ref)
+            raise
+        with self._lock:
+            previous, self._attached = self._attached, path
+        if previous is not None and previous != path:
+            try:
+                os.remove(f"{previous}.{os.getpid()}.ref")
+            except OSError:
+                pass
+            self.collect()
+        return cube
+
+    # Function to delete the versions that are not current and that no running process marks
+    # (a version still mapped on Windows cannot be deleted yet and is retried on the next call)
+    def collect(self):
+        current, _ = self.current()
+        prefix = f"{self.name}."
+        files = os.listdir(self.directory)
+        for file in files:
+            version, extension = os.path.splitext(file[len(prefix):])
+            if not (file.startswith(prefix) and extension in (".cube", ".arrow") and version.isdigit()):
+                continue
+            path = os.path.join(self.directory, file)
+            if path == current:
+                continue
+            in_use = False
+            for ref in [ref for ref in files if ref.startswith(f"{file}.") and ref.endswith(".ref")]:
+                if process_alive(int(ref[len(file) + 1:-len(".ref")])):
+                    in_use = True
+                else:
+                    try:
+                        os.remove(os.path.join(self.directory, ref))
+                    except OSError:
+                        pass
+            if not in_use:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # Function to take the publish lock, so only one process loads the next version; yields whether
+    # it was taken. A lock older than SHARED_PUBLISH_TIMEOUT_SECONDS is left by a dead loader and broken.
+    @contextmanager
+    def publishing(self):
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            if time.time() - os.path.getmtime(self.lock_path) > SHARED_PUBLISH_TIMEOUT_SECONDS:
+                os.remove(self.lock_path)
+        except OSError:
+            pass
+        try:
+            os.close(os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            try:
+                os.remove(self.lock_path)
+            except OSError:
+                pass
+
+    # Function to wait for another process's first publish; returns the current version or (None, None)
+    def wait_for_version(self, timeout):
+        deadline = time.time() + timeout
+        path, fetched_at = self.current()
+        while path is None and time.time() < deadline and os.path.exists(self.lock_path):
+            time.sleep(0.2)
+            path, fetched_at = self.current()
+        return path, fetched_at
+
+# Shared dataset of one server and database, one per process
+@st.cache_resource
+def get_shared_dataset(server, database):
+    return SharedDataset(SHARED_DATA_DIR, dataset_name(server, database))
+
+# Function to fetch the dashboard table's aggregate cube through the shared dataset.
+# The current version is mapped if another process published it after the version this process
+# shows (or, on a cold start, if it is younger than the cache TTL). Otherwise this process loads the
+# table and publishes it, unless another process is already doing so; then the current version is
+# served meanwhile (the first time, the load is waited for).
+def fetch_table_shared(pool, server, database, force=False, prepare=None, stale_ok=False):
+    dataset = get_shared_dataset(server, database)
+    query = table_query()
+
+    def needs_load(previous):
+        path, fetched_at = dataset.current()
+        if path is None:
+            return True
+        if previous is not None:
+            return fetched_at <= previous.fetched_at
+        return force or time.time() - fetched_at > QUERY_CACHE_TTL_SECONDS
+
+    def load(previous):
+        if needs_load(previous):
+            with dataset.publishing() as publisher:
+                # Checked again: another process may have published while the lock was taken
+                if publisher and needs_load(previous):
+                    df = fetch_table_rows(pool, query)
+                    if df is None:
+                        return None, {}
+                    fetched_at = time.time()
+                    columns = add_derived_columns(df)
+                    with record_stage("publish", rows=len(columns)):
+                        dataset.publish(columns, fetched_at)
+        # A version published and collected by other processes between reading the pointer and
+        # mapping the file is skipped for the one after it
+        for attempt in range(3):
+            path, fetched_at = dataset.current()
+            if path is None:
+                path, fetched_at = dataset.wait_for_version(SHARED_PUBLISH_TIMEOUT_SECONDS)
+                if path is None:
+                    st.error("No shared data version was published.")
+                    return None, {}
+            # The mapped version is still current (another process is loading the next one, or the
+            # last load found no changes): the cached entry stays, with the version's fetch time
+            if previous is not None and path == previous.info.get("path"):
+                return previous.value, {**previous.info, "fetched_at": fetched_at}
+            try:
+                with record_stage("attach"):
+                    cube = dataset.attach(path)
+            except FileNotFoundError:
+                continue
+            return cube, {"fetched_at": fetched_at, "source": "shared", "path": path}
+        st.error("The shared data kept changing while it was being mapped.")
+        return None, {}
+
+    # The mapped pages are shared with other processes, so they are not counted against the cache
+    return get_query_cache().get_or_load((server, database, query, "shared"), load, lambda cube: 0, force, prepare, stale_ok)
+
+# Bucket edges for the derived columns as (label, low, high, closed): "both" means low <= x <= high,
+# "right" means low < x <= high. Values outside every bin get the default label.
+SALARY_RANGE_BINS = [
+    ("40k-60k", 40000, 60000, "both"),
+    ("60k-80k", 60001, 80000, "both"),
+    ("80k-100k", 80001, 100000, "both"),
+    ("100k-130k", 100001, 129492, "both"),
+]
+SALARY_RANGE_DEFAULT = "Unknown"
+TENURE_GROUP_BINS = [
+    ("Low Tenure(>=1 to <=4)", 1, 4, "both"),
+    ("Medium Tenure(>4 to <=8)", 4, 8, "right"),
+]
+TENURE_GROUP_DEFAULT = "High Tenure(>8 to <=14)"
+AGE_GROUP_BINS = [
+    ("21-30", 21, 30, "both"),
+    ("31-40", 30, 40, "right"),
+    ("41-50", 40, 50, "right"),
+    ("51-60", 50, 60, "right"),
+]
+AGE_GROUP_DEFAULT = ">60"
+
+# Dimensions of the aggregate cube, and the histogram columns it keeps as value counts
+CUBE_DIMENSIONS = [
+    "title",
+    "sex",
+    "left",
+    "salary_range",
+    "tenure_group",
+    "age_group",
+    "Last_performance_rating",
+    "hire_year",
+    "exit_year",
+    "first_row_of_emp",
+]
+CUBE_VALUE_COLUMNS = ["salary", "tenure_days"]
+
+# Columns the sidebar filters select on (all of them cube dimensions)
+FILTER_COLUMNS = ["title", "sex", "left", "salary_range", "Last_performance_rating", "hire_year"]
+
+# Among an employee's rows, the one counted once per employee (distinct_on) is the first in this
+# order, missing values first (as SQL sorts them)
+FIRST_ROW_ORDER = ["title", "salary"]
+
+# Date and time functions for each supported SQL dialect
+SQL_DIALECTS = {
+    "mssql": {
+        "today": "GETDATE()",
+        "days_between": "DATEDIFF(day, {0}, {1})",
+        "year": "YEAR({0})",
+        "grouping_sets": True,
+    },
+    "sqlite": {
+        "today": "datetime('now', 'localtime')",
+        "days_between": "CAST(julianday({1}) - julianday({0}) AS INTEGER)",
+        "year": "CAST(strftime('%Y', {0}) AS INTEGER)",
+        "grouping_sets": False,
+    },
+}
+
+# Grouping and measures behind each visualization.
+# Measures are (function, column) pairs; a column of None counts rows.
+# A histogram (column, bins) groups by equal-width bins between the column's smallest and largest value.
+VISUALIZATION_AGGREGATES = {
+    # Key Metrics and Visualization 4
+    "key_metrics": {
+        "group_by": ["left"],
+        "dropna": False,
+        "measures": {
+            "n": ("count", None),
+            "salary_max": ("max", "salary"),
+            "salary_min": ("min", "salary"),
+            "salary_sum": ("sum", "salary"),
+            "salary_count": ("count", "salary"),
+        },
+    },
+    # Visualization 1
+    "salary_histogram": {
+        "group_by": ["salary_bin"],
+        "histogram": ("salary", 5),
+        "measures": {"n": ("count", None), "salary_min": ("min", "salary"), "salary_max": ("max", "salary")},
+    },
+    # Visualization 2
+    "avg_salary_by_title_unique": {
+        "group_by": ["title"],
+        "distinct_on": "emp_no",
+        "measures": {"salary": ("mean", "salary")},
+    },
+    # Key Metrics (tenure) and Visualization 3
+    "tenure_days": {
+        "group_by": ["tenure_days"],
+        "measures": {"n": ("count", None)},
+    },
+    # Visualization 5
+    "attrition_by_gender": {
+        "group_by": ["sex"],
+        "where": [("left", "=", 1)],
+        "measures": {"n": ("count", None)},
+    },
+    # Visualization 6
+    "attrition_by_title": {
+        "group_by": ["title"],
+        "where": [("left", "=", 1)],
+        "measures": {"total_no": ("count", None)},
+    },
+    # Visualization 7
+    "employees_by_salary_range": {
+        "group_by": ["salary_range"],
+        "measures": {"NO_OF_EMP": ("count", "emp_no")},
+    },
+    # Visualization 8
+    "attrition_by_rating": {
+        "group_by": ["Last_performance_rating"],
+        "where": [("left", "=", 1)],
+        "measures": {"total_no": ("count", None)},
+    },
+    # Visualizations 9 and 10
+    "attrition_by_tenure_group": {
+        "group_by": ["tenure_group"],
+        "where": [("left", "=", 1)],
+        "measures": {"NO_OF_EMP": ("count", None)},
+    },
+    # Visualization 11
+    "attrition_by_age_group": {
+        "group_by": ["age_group"],
+        "where": [("left", "=", 1)],
+        "measures": {"NO_OF_EMP": ("count", None)},
+    },
+    # Visualizations 12 and 13
+    "employees_by_title": {
+        "group_by": ["title"],
+        "measures": {"total_emp": ("count", None), "avg_sal": ("mean", "salary")},
+    },
+    # Visualizations 14 and 16
+    "hires_by_year": {
+        "group_by": ["hire_year"],
+        "measures": {"employee_count": ("count", None), "avg_salary": ("mean", "salary")},
+    },
+    # Visualization 15
+    "exits_by_year": {
+        "group_by": ["exit_year"],
+        "where": [("exit_year", "notnull", None)],
+        "measures": {"total_exits": ("count", "emp_no")},
+    },
+    # Visualization 17
+    "employees_by_gender": {
+        "group_by": ["sex"],
+        "measures": {"total_no": ("count", None)},
+    },
+    # Sidebar filter options
+    "employees_by_rating": {
+        "group_by": ["Last_performance_rating"],
+        "measures": {"total_no": ("count", None)},
+    },
+}
+
+# Function to label values by bucket: np.select over the configured (label, low, high, closed) bins.
+# Returns a Categorical whose categories are sorted like the plain string labels.
+def bucketize(values, bins, default):
+    labels = [label for label, low, high, closed in bins] + [default]
+    conditions = [
+        ((values >= low) if closed == "both" else (values > low)) & (values <= high)
+        for label, low, high, closed in bins
+    ]
+    codes = np.select(conditions, range(len(bins)), default=len(bins))
+    categories = sorted(set(labels))
+    return pd.Categorical.from_codes(np.array([categories.index(label) for label in labels])[codes], categories)
+
+# Function to number values by equal-width bin between low and high, like numpy's histogram (the
+# highest value is in the last bin, and equal values all fall in the middle bin)
+def histogram_bins(values, low, high, bins):
+    if high == low:
+        return np.full(len(values), bins // 2, dtype=np.int64)
+    return np.minimum((bins * (values - low) / (high - low)).astype(np.int64), bins - 1)
+
+# Function to add the derived columns the visualizations group by, all in vectorized steps.
+# The input's columns are shared, not copied (none of them is modified in place).
+def add_derived_columns(df, today=None):
+    df = df.copy(deep=False)
+    today = pd.Timestamp.today() if today is None else today
+    with record_stage("parse_dates", rows=len(df)):
+        for column in ["hire_date", "last_date", "birth_date"]:
+            if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+                df[column] = pd.to_datetime(df[column], errors="coerce", format="ISO8601")
+    with record_stage("derived_columns", rows=len(df)):
+        end_date = df["last_date"].fillna(today)
+        tenure_days = (end_date - df["hire_date"]).dt.days
+        age = (end_date - df["birth_date"]).dt.days / 365
+        df["tenure_days"] = pd.to_numeric(tenure_days, downcast="integer")
+        df["salary_range"] = bucketize(df["salary"], SALARY_RANGE_BINS, SALARY_RANGE_DEFAULT)
+        df["tenure_group"] = bucketize(tenure_days / 365, TENURE_GROUP_BINS, TENURE_GROUP_DEFAULT)
+        df["age_group"] = bucketize(age, AGE_GROUP_BINS, AGE_GROUP_DEFAULT)
+        df["hire_year"] = pd.to_numeric(df["hire_date"].dt.year, downcast="integer")
+        df["exit_year"] = pd.to_numeric(df["last_date"].dt.year, downcast="integer")
+    return df
+
+# SQL CASE expression for the same bins; scale converts bin edges to the expression's unit
+def bucket_sql(expression, bins, default, scale=1):
+    cases = []
+    for label, low, high, closed in bins:
+        op = ">=" if closed == "both" else ">"
+        cases.append(f" WHEN {expression} {op} {low * scale} AND {expression} <= {high * scale} THEN '{label}'")
+    return "CASE" + "".join(cases) + f" ELSE '{default}' END"
+
+# SQL expressions for the derived columns (tenure and age buckets compare whole days, i.e. years * 365)
+def dimension_sql(dialect):
+    functions = SQL_DIALECTS[dialect]
+    tenure_days = functions["days_between"].format("[hire_date]", f"COALESCE([last_date], {functions['today']})")
+    age_days = functions["days_between"].format("[birth_date]", f"COALESCE([last_date], {functions['today']})")
+    return {
+        "tenure_days": tenure_days,
+        "salary_range": bucket_sql("[salary]", SALARY_RANGE_BINS, SALARY_RANGE_DEFAULT),
+        "tenure_group": bucket_sql(tenure_days, TENURE_GROUP_BINS, TENURE_GROUP_DEFAULT, scale=365),
+        "age_group": bucket_sql(age_days, AGE_GROUP_BINS, AGE_GROUP_DEFAULT, scale=365),
+        "hire_year": functions["year"].format("[hire_date]"),
+        "exit_year": functions["year"].format("[last_date]"),
+    }
+
+# SQL literal of a filter value
+def sql_literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+# SQL expression numbering a column's values by equal-width bin, like histogram_bins; low and high
+# are the columns holding the smallest and largest value
+def histogram_sql(column, low, high, bins):
+    return (
+        f"CASE WHEN [{column}] IS NULL THEN NULL WHEN [{high}] = [{low}] THEN {bins // 2}"
+        f" WHEN [{column}] >= [{high}] THEN {bins - 1}"
+        f" ELSE CAST(CAST({bins} * ([{column}] - [{low}]) AS FLOAT) / ([{high}] - [{low}]) AS INTEGER) END"
+    )
+
+# Grouping sets of the aggregate definitions and every column they group by, in order
+def aggregate_grouping_sets():
+    sets = list(dict.fromkeys(tuple(spec["group_by"]) for spec in VISUALIZATION_AGGREGATES.values()))
+    keys = list(dict.fromkeys(key for keys in sets for key in keys))
+    return sets, keys
+
+# GROUPING_ID of a grouping set: one bit per key, set for the keys the set does not group by
+def grouping_id(grouping_set, keys):
+    return sum(1 << (len(keys) - 1 - position) for position, key in enumerate(keys) if key not in grouping_set)
+
+# SQL aggregate expressions of every aggregate definition, with its where and distinct_on as
+# conditions inside them. Each distinct expression gets one result column, so definitions sharing
+# a measure share it. Returns ({expression: column}, {name: {measure: column}}, {name: column}),
+# the last counting the rows of each definition with conditions (groups without any are dropped).
+def aggregate_measures():
+    columns, measures, rows = {}, {}, {}
+    for name, spec in VISUALIZATION_AGGREGATES.items():
+        conditions = [
+            f"[{column}] IS NOT NULL" if op == "notnull" else f"[{column}] {op} {value}"
+            for column, op, value in spec.get("where", [])
+        ]
+        if spec.get("distinct_on"):
+            conditions.append(f"[_row_no_{spec['distinct_on']}] = 1")
+        when = " AND ".join(conditions)
+        measures[name] = {}
+        for measure, (func, column) in spec["measures"].items():
+            value = "1" if column is None else f"CAST([{column}] AS FLOAT)" if func in ("sum", "mean") else f"[{column}]"
+            if when:
+                value = f"CASE WHEN {when} THEN {value} END"
+            function = "COUNT" if column is None else "AVG" if func == "mean" else func.upper()
+            measures[name][measure] = columns.setdefault(f"{function}({value})", f"m{len(columns)}")
+        if when:
+            rows[name] = columns.setdefault(f"COUNT(CASE WHEN {when} THEN 1 END)", f"m{len(columns)}")
+    return columns, measures, rows
+
+# Function to turn every aggregate definition into a single query, restricted to the rows matching
+# the filters ((column, values), ...), so the table is read once for the aggregates (and once more
+# for the histogram ranges). The result has a [_set] column with the GROUPING_ID of the row's
+# grouping set and the aggregate_measures columns (see split_aggregates). Dialects without GROUPING
+# SETS union one GROUP BY per set over the common table expression, each computing only the
+# measures of its own definitions.
+def build_aggregates_sql(dialect, table=TABLE_NAME, filters=()):
+    sets, keys = aggregate_grouping_sets()
+    distinct = list(dict.fromkeys(spec["distinct_on"] for spec in VISUALIZATION_AGGREGATES.values() if spec.get("distinct_on")))
+    order = ", ".join(f"[{column}]" for column in FIRST_ROW_ORDER)
+    numbers = [f"ROW_NUMBER() OVER (PARTITION BY [{column}] ORDER BY {order}) AS [_row_no_{column}]" for column in distinct]
+    rows = f"SELECT {', '.join([f'[{column}]' for column in TABLE_SCHEMA] + numbers)} FROM {table}"
+    # Dates only feed the derived columns, so they are not carried further
+    kept = [f"[{column}]" for column, kind in TABLE_SCHEMA.items() if kind != "datetime"]
+    kept += [f"[_row_no_{column}]" for column in distinct]
+    derived = [f"{expression} AS [{name}]" for name, expression in dimension_sql(dialect).items()]
+    rows = f"SELECT * FROM (SELECT {', '.join(kept + derived)} FROM ({rows}) AS t) AS t"
+    conditions = [
+        f"[{column}] IN ({', '.join(sql_literal(value) for value in values)})" if values else "1 = 0"
+        for column, values in filters
+    ]
+    if conditions:
+        rows += " WHERE " + " AND ".join(conditions)
+    query = f"WITH t AS ({rows})"
+
+    # Histogram ranges are taken over the filtered rows; only sets grouping by a bin read them
+    histograms = {spec["group_by"][0]: spec["histogram"] for spec in VISUALIZATION_AGGREGATES.values() if spec.get("histogram")}
+    binned = "t"
+    if histograms:
+        ranges = [f"MIN([{column}]) AS [_{key}_low], MAX([{column}]) AS [_{key}_high]" for key, (column, bins) in histograms.items()]
+        bins = [f"{histogram_sql(column, f'_{key}_low', f'_{key}_high', bins)} AS [{key}]" for key, (column, bins) in histograms.items()]
+        query += f", r AS (SELECT {', '.join(ranges)} FROM t)"
+        binned = f"(SELECT t.*, {', '.join(bins)} FROM t CROSS JOIN r) AS t"
+
+    columns, measures, rows_columns = aggregate_measures()
+    if SQL_DIALECTS[dialect]["grouping_sets"]:
+        grouping = ", ".join("(" + ", ".join(f"[{key}]" for key in grouping_set) + ")" for grouping_set in sets)
+        return (
+            f"{query} SELECT GROUPING_ID({', '.join(f'[{key}]' for key in keys)}) AS [_set], "
+            f"{', '.join(f'[{key}]' for key in keys)}, {', '.join(f'{expression} AS [{column}]' for expression, column in columns.items())} "
+            f"FROM {binned} GROUP BY GROUPING SETS ({grouping})"
+        )
+    selects = []
+    for grouping_set in sets:
+        used = {
+            column
+            for name, spec in VISUALIZATION_AGGREGATES.items() if tuple(spec["group_by"]) == grouping_set
+            for column in [*measures[name].values(), rows_columns.get(name)]
+        }
+        selected = [f"[{key}]" if key in grouping_set else f"NULL AS [{key}]" for key in keys]
+        selected += [f"{expression if column in used else 'NULL'} AS [{column}]" for expression, column in columns.items()]
+        selects.append(
+            f"SELECT {grouping_id(grouping_set, keys)} AS [_set], {', '.join(selected)} "
+            f"FROM {binned if histograms.keys() & set(grouping_set) else 't'} GROUP BY {', '.join(f'[{key}]' for key in grouping_set)}"
+        )
+    return f"{query} " + " UNION ALL ".join(selects)
+
+# Integer values come back as floats when other rows of their column are NULL
+def restore_integers(values):
+    if values.dtype.kind == "f" and values.notna().all() and (values % 1 == 0).all():
+        return values.astype(np.int64)
+    return values
+
+# Function to split the result of build_aggregates_sql into each definition's aggregate
+def split_aggregates(result):
+    sets, keys = aggregate_grouping_sets()
+    columns, measures, rows_columns = aggregate_measures()
+    aggregates = {}
+    for name, spec in VISUALIZATION_AGGREGATES.items():
+        rows = result[result["_set"] == grouping_id(spec["group_by"], keys)]
+        if name in rows_columns:
+            rows = rows[rows[rows_columns[name]] > 0]
+        aggregate = pd.DataFrame({key: restore_integers(rows[key]) for key in spec["group_by"]})
+        for measure, column in measures[name].items():
+            aggregate[measure] = restore_integers(rows[column]) if spec["measures"][measure][0] == "count" else rows[column]
+        if spec.get("dropna", True):
+            aggregate = aggregate.dropna(subset=spec["group_by"])
+        # Match the key order pandas' groupby produces
+        aggregates[name] = aggregate.sort_values(spec["group_by"], na_position="last").reset_index(drop=True)
+    return aggregates
+
+# Plain values for the chart code (a categorical key would plot empty categories too)
+def plain_keys(result, keys):
+    for key in keys:
+        if isinstance(result[key].dtype, pd.CategoricalDtype):
+            result[key] = np.asarray(result[key])
+    return result
+
+# Counts, sums and extremes of the rows in each cell of the cube, from which every
+# visualization measure can be rolled up
+def cube_measures(df):
+    grouped = df.groupby(CUBE_DIMENSIONS, dropna=False, observed=True, sort=False)
+    return grouped.agg(
+        n=("emp_no", "size"),
+        emp_no__count=("emp_no", "count"),
+        salary__count=("salary", "count"),
+        salary__sum=("salary", "sum"),
+        salary__min=("salary", "min"),
+        salary__max=("salary", "max"),
+    ).reset_index()
+
+# Per-value bitmaps of some columns of a frame (one bit per row, packed eight rows to a byte).
+# A filter selection is an OR of bitmaps within a column and an AND across columns, so combining
+# filters never rescans the frame. Missing values are in no bitmap.
+class BitmapIndex:
+    def __init__(self, frame, columns):
+        self.length = len(frame)
+        self.bitmaps = {}
+        for column in columns:
+            codes, uniques = pd.factorize(frame[column])
+            self.bitmaps[column] = {value: np.packbits(codes == code) for code, value in enumerate(uniques)}
+
+    # The bitmaps as Arrow tables named <prefix>:<column>, with a column per value, and the values
+    # of each column as JSON
+    def to_tables(self, prefix):
+        tables = {
+            f"{prefix}:{column}": pa.table([pa.array(bitmap) for bitmap in bitmaps.values()], names=[str(i) for i in range(len(bitmaps))])
+            for column, bitmaps in self.bitmaps.items()
+        }
+        return tables, {column: [to_query_param(value) for value in bitmaps] for column, bitmaps in self.bitmaps.items()}
+
+    # Index of length rows from the tables and values of to_tables; its bitmaps are views of the
+    # tables' buffers
+    @classmethod
+    def from_tables(cls, length, tables, prefix, values):
+        index = cls.__new__(cls)
+        index.length = length
+        index.bitmaps = {
+            column: {value: tables[f"{prefix}:{column}"].column(str(i)).to_numpy() for i, value in enumerate(column_values)}
+            for column, column_values in values.items()
+        }
+        return index
+
+    # Boolean row mask of a filter selection ((column, values), ...); None when nothing is filtered
+    def mask(self, filters):
+        combined = None
+        for column, values in filters:
+            bitmaps = [self.bitmaps[column][value] for value in values if value in self.bitmaps[column]]
+            selected = np.bitwise_or.reduce(bitmaps) if bitmaps else np.zeros((self.length + 7) // 8, np.uint8)
+            combined = selected if combined is None else combined & selected
+        if combined is None:
+            return None
+        return np.unpackbits(combined, count=self.length).view(bool)
+
+    # Memory used by the bitmaps
+    def size(self):
+        return sum(bitmap.nbytes for bitmaps in self.bitmaps.values() for bitmap in bitmaps.values())
+
+# Sorted distinct values of a column and each row's position among them, in the smallest
+# integer type that fits (missing values get the position one past the last value)
+def factorize_codes(values):
+    codes, uniques = pd.factorize(values, sort=True)
+    codes[codes < 0] = len(uniques)
+    return codes.astype(np.min_scalar_type(len(uniques))), uniques
+
+# Function to mark the first row of each value of a column, by the given columns (missing values
+# first, then table order). Only rows whose value repeats are sorted.
+def first_rows(df, column, order):
+    repeated = df[column].duplicated(keep=False).to_numpy()
+    first = ~repeated
+    positions = np.flatnonzero(repeated)
+    if len(positions):
+        rows = pd.DataFrame({
+            # Category order may not be the values' order, so categories are sorted by value
+            name: np.asarray(df[name].iloc[positions], dtype=object if isinstance(df[name].dtype, pd.CategoricalDtype) else None)
+            for name in [column] + order
+        })
+        rows = rows.sort_values([column] + order, na_position="first", kind="stable")
+        first[positions[rows.index[~rows[column].duplicated()]]] = True
+    return pd.Series(first, index=df.index)
+
+# Pre-aggregated view of the data: one grouped pass over the dashboard dimensions plus
+# value counts for the histogram columns. Every chart and metric is rolled up from it.
+# A cube built with row indexes can also answer every aggregate for a filter selection.
+class AggregateCube:
+    def __init__(self, groups, values):
+        self.groups = groups
+        self.values = values
+        self.row_index = None
+        self.row_values = None
+        self._plans = None
+        self._group_index = None
+        self._measures = None
+        self._lock = threading.Lock()
+
+    # Cube of one DataFrame; seen (a SeenEmployees) holds employees already counted in other partial
+    # cubes. index_rows keeps bitmap indexes and value codes of the rows so histograms can be filtered.
+    @classmethod
+    def build(cls, df, seen=None, index_rows=True):
+        with record_stage("cube", rows=len(df)):
+            first_row_of_emp = first_rows(df, "emp_no", FIRST_ROW_ORDER)
+            if seen is not None:
+                first_row_of_emp &= ~seen.contains(df["emp_no"])
+            df = df.copy(deep=False)
+            df["first_row_of_emp"] = first_row_of_emp
+            values = {
+                column: df.groupby(column).size().reset_index(name="n")
+                for column in CUBE_VALUE_COLUMNS
+            }
+            cube = cls(cube_measures(df), values)
+        if index_rows:
+            with record_stage("filter_index", rows=len(df)):
+                cube.row_index = BitmapIndex(df, FILTER_COLUMNS)
+                cube.row_values = {column: factorize_codes(df[column]) for column in CUBE_VALUE_COLUMNS}
+        return cube
+
+    # Function to combine cubes built from disjoint sets of rows into the cube of all of them
+    @classmethod
+    def merge(cls, cubes):
+        with record_stage("cube_merge"):
+            groups = pd.concat([cube.groups for cube in cubes], ignore_index=True)
+            groups = groups.groupby(CUBE_DIMENSIONS, dropna=False, observed=True, sort=False).agg(
+                n=("n", "sum"),
+                emp_no__count=("emp_no__count", "sum"),
+                salary__count=("salary__count", "sum"),
+                salary__sum=("salary__sum", "sum"),
+                salary__min=("salary__min", "min"),
+                salary__max=("salary__max", "max"),
+            ).reset_index()
+            values = {
+                column: pd.concat([cube.values[column] for cube in cubes]).groupby(column)["n"].sum().reset_index()
+                for column in CUBE_VALUE_COLUMNS
+            }
+            return cls(groups, values)
+
+    # The cube, its row indexes and its rollup plans as Arrow tables plus JSON metadata (row counts
+    # and the values of the bitmaps), to be written with write_arrow_bundle and mapped back by
+    # from_tables
+    def to_tables(self):
+        group_index, plans = self.prepared()
+        tables = {"groups": shared_arrow_table(self.groups), "measures": pa.table(self._measures)}
+        for column, values in self.values.items():
+            tables[f"values:{column}"] = shared_arrow_table(values)
+        for column, (codes, uniques) in self.row_values.items():
+            tables[f"codes:{column}"] = pa.table({"codes": codes})
+            tables[f"uniques:{column}"] = pa.table({"uniques": np.asarray(uniques)})
+        for name, (codes, keys) in plans.items():
+            tables[f"plan:{name}"] = pa.table({"codes": codes})
+            tables[f"plan_keys:{name}"] = shared_arrow_table(keys)
+        row_tables, row_values = self.row_index.to_tables("index")
+        group_tables, group_values = group_index.to_tables("group_index")
+        metadata = {
+            "length": self.row_index.length,
+            "index_values": row_values,
+            "group_index_values": group_values,
+            "plans": list(plans),
+        }
+        return {**tables, **row_tables, **group_tables}, metadata
+
+    # Cube from the tables of to_tables, with its rollup plans already built; its arrays are views
+    # of the tables' buffers (read-only when the tables are mapped from a file)
+    @classmethod
+    def from_tables(cls, tables, metadata):
+        def array(name, column):
+            return tables[name].column(column).to_numpy()
+
+        cube = cls(
+            tables["groups"].to_pandas(split_blocks=True),
+            {column: tables[f"values:{column}"].to_pandas(split_blocks=True) for column in CUBE_VALUE_COLUMNS},
+        )
+        cube.row_index = BitmapIndex.from_tables(metadata["length"], tables, "index", metadata["index_values"])
+        cube.row_values = {
+            column: (array(f"codes:{column}", "codes"), array(f"uniques:{column}", "uniques"))
+            for column in CUBE_VALUE_COLUMNS
+        }
+        cube._group_index = BitmapIndex.from_tables(len(cube.groups), tables, "group_index", metadata["group_index_values"])
+        cube._measures = {column: array("measures", column) for column in tables["measures"].column_names}
+        cube._plans = {
+            name: (array(f"plan:{name}", "codes"), tables[f"plan_keys:{name}"].to_pandas(split_blocks=True))
+            for name in metadata["plans"]
+        }
+        return cube
+
+    # Memory used by the cube (not counting the rollup plans, see plans_size)
+    def size(self):
+        size = frame_size(self.groups) + sum(frame_size(values) for values in self.values.values())
+        if self.row_index is not None:
+            size += self.row_index.size()
+            size += sum(codes.nbytes for codes, uniques in self.row_values.values())
+        return size
+
+    # Memory used by the rollup plans, once they are built
+    def plans_size(self):
+        with self._lock:
+            if self._plans is None:
+                return 0
+            size = self._group_index.size() + sum(values.nbytes for values in self._measures.values())
+            return size + sum(codes.nbytes + frame_size(keys) for codes, keys in self._plans.values())
+
+    # Bitmap index of the cube rows and, per aggregate definition, the output keys and the output
+    # row every cube row adds to (one past the last output row if none); built on first use
+    def prepared(self):
+        with self._lock:
+            if self._plans is None:
+                with record_stage("rollup_plans", rows=len(self.groups)):
+                    self._group_index = BitmapIndex(self.groups, FILTER_COLUMNS)
+                    self._measures = {
+                        column: self.groups[column].to_numpy(dtype=float)
+                        for column in self.groups.columns
+                        if "__" in column or column == "n"
+                    }
+                    self._plans = {
+                        name: self._plan(spec)
+                        for name, spec in VISUALIZATION_AGGREGATES.items()
+                        if not spec.get("histogram") and spec["group_by"][0] not in self.values
+                    }
+            return self._group_index, self._plans
+
+    def _plan(self, spec):
+        groups = self.groups
+        rows = np.ones(len(groups), dtype=bool)
+        for column, op, value in spec.get("where", []):
+            rows &= (groups[column].notna() if op == "notnull" else groups[column] == value).to_numpy()
+        if spec.get("distinct_on"):
+            rows &= groups["first_row_of_emp"].to_numpy()
+        grouped = groups[rows].groupby(spec["group_by"], dropna=spec.get("dropna", True), observed=True)
+        keys = plain_keys(grouped.size().index.to_frame(index=False), spec["group_by"])
+        codes = np.full(len(groups), len(keys), dtype=np.intp)
+        codes[rows] = grouped.ngroup().fillna(len(keys)).to_numpy(dtype=np.intp)
+        return codes, keys
+
+    # The cube rows matching a filter selection (None for all), the measures of those rows, and
+    # the matching table rows; computed once and shared by every rollup of the selection
+    def selection(self, filters):
+        group_index, plans = self.prepared()
+        group_mask = group_index.mask(filters)
+        if group_mask is None:
+            return None, self._measures, None
+        if self.row_index is None:
+            raise ValueError("This cube keeps no row indexes, so it cannot be filtered")
+        rows = np.flatnonzero(group_mask)
+        measures = {column: values[rows] for column, values in self._measures.items()}
+        return rows, measures, np.flatnonzero(self.row_index.mask(filters))
+
+    # Value counts of a histogram column for the table rows of a selection
+    def value_counts(self, column, selection):
+        rows, measures, table_rows = selection
+        if table_rows is None:
+            return self.values[column]
+        codes, uniques = self.row_values[column]
+        counts = np.bincount(codes[table_rows], minlength=len(uniques) + 1)[:-1]
+        present = counts > 0
+        return pd.DataFrame({column: np.asarray(uniques)[present], "n": counts[present]})
+
+    # Function to answer one aggregate definition from the cube, for the rows matching the filters:
+    # sums, counts and extremes of the selected cube rows are accumulated per output row with numpy
+    def rollup(self, name, filters=(), selection=None):
+        selection = self.selection(filters) if selection is None else selection
+        spec = VISUALIZATION_AGGREGATES[name]
+        keys = spec["group_by"]
+        if spec.get("histogram"):
+            column, bins = spec["histogram"]
+            counts = self.value_counts(column, selection)
+            values = counts[column].to_numpy(dtype=float)
+            counts = counts.assign(**{keys[0]: histogram_bins(values, values.min(), values.max(), bins) if len(values) else np.zeros(0, np.int64)})
+            return counts.groupby(keys[0]).agg(**{
+                measure: ("n", "sum") if source is None else (source, func)
+                for measure, (func, source) in spec["measures"].items()
+            }).reset_index()
+        if keys[0] in self.values:
+            (measure, _), = spec["measures"].items()
+            return self.value_counts(keys[0], selection).rename(columns={"n": measure})
+
+        group_index, plans = self.prepared()
+        codes, result = plans[name]
+        size = len(result)
+        rows, measures, table_rows = selection
+        if rows is not None:
+            codes = codes[rows]
+        present = np.bincount(codes, minlength=size + 1)[:-1] > 0
+        result = result[present].reset_index(drop=True)
+
+        def accumulate(column, func="sum"):
+            values = measures[column]
+            if func == "sum":
+                return np.bincount(codes, weights=values, minlength=size + 1)[:-1][present]
+            extremes = np.full(size + 1, np.inf if func == "min" else -np.inf)
+            (np.fmin if func == "min" else np.fmax).at(extremes, codes, values)
+            extremes = extremes[:-1][present]
+            extremes[np.isinf(extremes)] = np.nan
+            return extremes
+
+        for measure, (func, column) in spec["measures"].items():
+            if column is None:
+                result[measure] = accumulate("n").round().astype(np.int64)
+            elif func == "mean":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    result[measure] = accumulate(f"{column}__sum") / accumulate(f"{column}__count")
+            elif func in ("min", "max"):
+                result[measure] = accumulate(f"{column}__{func}", func)
+            elif func == "count":
+                result[measure] = accumulate(f"{column}__count").round().astype(np.int64)
+            else:
+                result[measure] = accumulate(f"{column}__{func}")
+        return result
+
+# Function to compute every visualization's aggregate from the cube, for the rows matching the filters
+def compute_aggregates(cube, filters=()):
+    # Built on first use; timed as its own stage, not as part of the selection
+    cube.prepared()
+    with record_stage("filter_selection"):
+        selection = cube.selection(filters)
+    aggregates = {}
+    for name in VISUALIZATION_AGGREGATES:
+        with record_stage(f"aggregate:{name}") as record:
+            aggregates[name] = cube.rollup(name, selection=selection)
+            record["rows"] = len(aggregates[name])
+    return aggregates
+
+# Employees counted in the earlier chunks of a streamed load. The rows arrive in emp_no order
+# (missing emp_no first, see streaming_query), so only the employee the previous chunk ended on can
+# continue in the next one; just that emp_no is kept, whatever the range of the numbers.
+class SeenEmployees:
+    def __init__(self):
+        self.started = False
+        self.last = None
+
+    # Boolean mask of the rows of employees already seen (rows with a missing emp_no count as
+    # one employee, like the SQL query's partition of them)
+    def contains(self, emp_no):
+        if not self.started:
+            return np.zeros(len(emp_no), dtype=bool)
+        if pd.isna(self.last):
+            return emp_no.isna().to_numpy()
+        return (emp_no == self.last).to_numpy()
+
+    def add(self, emp_no):
+        if len(emp_no):
+            self.started = True
+            self.last = emp_no.iloc[-1]
+
+# Function to aggregate a table chunk by chunk: each chunk of STREAM_CHUNK_ROWS rows gets its derived
+# columns, is reduced to a partial cube and merged, so only one chunk of rows is in memory at a time.
+# progress(rows_done, rows_total) is called after every chunk.
+def load_table_streaming(pool, query, progress=None):
+    try:
+        with pool.connection() as conn:
+            total = int(pd.read_sql(f"SELECT COUNT(*) AS n FROM {TABLE_NAME}", conn)["n"].iloc[0])
+            today = pd.Timestamp.today()
+            cubes = []
+            seen = SeenEmployees()
+            done = 0
+            with closing(execute_query(conn, query)) as cursor:
+                while True:
+                    chunk = fetch_frame(cursor, STREAM_CHUNK_ROWS)
+                    if not len(chunk):
+                        break
+                    cubes.append(AggregateCube.build(add_derived_columns(compact_table(chunk), today), seen, index_rows=False))
+                    seen.add(chunk["emp_no"])
+                    # The running cube is regrouped once per batch of chunks, not once per chunk
+                    if len(cubes) > STREAM_MERGE_BATCH:
+                        cubes = [AggregateCube.merge(cubes)]
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(done, total)
+            cube = None
+            if len(cubes) > 1:
+                cube = AggregateCube.merge(cubes)
+            elif cubes:
+                cube = cubes[0]
+    except Exception as e:
+        st.error(f"Error fetching data: {e}")
+        return None, {}
+    if cube is None:
+        st.error(f"No rows in {TABLE_NAME}.")
+    return cube, {"rows": done}
+
+# Query of the streamed load: rows in employee and FIRST_ROW_ORDER order, so an employee's first
+# row is in the first chunk holding the employee
+def streaming_query(table=TABLE_NAME):
+    return f"{table_query(table)} ORDER BY {', '.join(f'[{column}]' for column in ['emp_no'] + FIRST_ROW_ORDER)}"
+
+# Function to fetch the dashboard table's aggregate cube by streaming it in chunks (see load_table_streaming)
+def fetch_table_streaming(pool, server, database, force=False, progress=None, prepare=None, stale_ok=False):
+    query = streaming_query()
+    return get_query_cache().get_or_load(
+        (server, database, query, "streaming"),
+        lambda previous: load_table_streaming(pool, query, progress),
+        lambda cube: cube.size(),
+        force,
+        prepare,
+        stale_ok,
+    )
+
+# SQL dialect of a server (see connection_factory)
+def sql_dialect(server):
+    return "sqlite" if server.lower() == "sqlite" else "mssql"
+
+# Function to run every visualization's aggregate on the server, in a single query
+def fetch_aggregates(pool, server, database, filters=()):
+    # Includes the connect, query and deserialize stages of the query when it is not cached
+    with record_stage("aggregate:sql"):
+        entry = fetch_data_cached(pool, server, database, build_aggregates_sql(sql_dialect(server), filters=filters))
+    if entry is None:
+        return None, None, None
+    return entry.derived("aggregates", split_aggregates), entry.fetched_at, f"sql:{entry.version}"
+
+# Aggregate cube and unfiltered aggregates of a table entry (a streamed or shared entry holds the
+# cube itself), built once per entry. Streamlit re-runs this script, redefining AggregateCube, while
+# cached entries keep their values, so the value is told apart from a frame rather than a cube.
+def prepare_entry(entry):
+    if not isinstance(entry.value, pd.DataFrame):
+        cube = entry.value
+    else:
+        # The derived frame shares the table's columns, so only the added ones are counted
+        columns = lambda df: entry.derived("columns", add_derived_columns, lambda derived: frame_size(derived.drop(columns=df.columns)))
+        cube = entry.derived("cube", lambda df: AggregateCube.build(columns(df)))
+    # A mapped cube (see fetch_table_shared) comes with its plans, which are not counted either
+    plans_size = (lambda plans: 0) if entry.info.get("path") else (lambda plans: cube.plans_size())
+    entry.derived("rollup_plans", lambda value: cube.prepared(), plans_size)
+    return cube, entry.derived("aggregates", lambda value: compute_aggregates(cube))
+
+# Reloads the tables shown on the page on a timer, off the request path. A reload runs the same
+# cached fetch with force=True and prepare_entry, so the new version is swapped into the cache
+# only once its cube and aggregates are built; sessions are served the previous one meanwhile.
+class BackgroundRefresher:
+    def __init__(self, interval_seconds, idle_seconds):
+        self.interval_seconds = interval_seconds
+        self.idle_seconds = idle_seconds
+        self._jobs = {}
+        self._thread = None
+        self._condition = threading.Condition()
+
+    # Function to keep refreshing a table while pages show it; reload() loads it again and
+    # returns the new cache entry (None on failure). The first reload is due one interval after
+    # fetched_at, the fetch time of the version pages show now.
+    def watch(self, key, reload, fetched_at):
+        with self._condition:
+            job = self._jobs.get(key)
+            if job is None:
+                job = self._jobs[key] = {"due": fetched_at + self.interval_seconds, "refreshing": False, "refreshed_at": None, "error": None}
+            job["reload"] = reload
+            job["watched_at"] = time.time()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="dashboard-refresher", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    # Function to move a watched table's next reload to now
+    def refresh_now(self, key):
+        with self._condition:
+            if key in self._jobs:
+                self._jobs[key]["due"] = 0
+                self._condition.notify()
+
+    # Refresh state of a watched table: whether a reload is running, the last successful reload's
+    # time and the last failure's message (None once a reload succeeds)
+    def status(self, key):
+        with self._condition:
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            return {"refreshing": job["refreshing"], "refreshed_at": job["refreshed_at"], "error": job["error"]}
+
+    def _run(self):
+        while True:
+            with self._condition:
+                now = time.time()
+                for key in [key for key, job in self._jobs.items() if now - job["watched_at"] > self.idle_seconds]:
+                    del self._jobs[key]
+                key = min(self._jobs, key=lambda key: self._jobs[key]["due"], default=None)
+                if key is None or self._jobs[key]["due"] > now:
+                    self._condition.wait(None if key is None else self._jobs[key]["due"] - now)
+                    continue
+                job = self._jobs[key]
+                job["refreshing"] = True
+                reload = job["reload"]
+            try:
+                error = None if reload() is not None else "the table could not be loaded"
+            except Exception as e:
+                error = str(e)
+            with self._condition:
+                job["refreshing"] = False
+                job["due"] = time.time() + self.interval_seconds
+                if error is None:
+                    job["refreshed_at"] = time.time()
+                job["error"] = error
+
+# Single background refresher for the whole server process
+@st.cache_resource
+def get_background_refresher():
+    return BackgroundRefresher(REFRESH_INTERVAL_SECONDS, REFRESH_IDLE_SECONDS)
+
+# Median of values given with their repeat counts (same convention as Series.median)
+def weighted_median(values, counts):
+    if len(values) == 0:
+        return np.nan
+    order = values.argsort()
+    values = values.to_numpy()[order]
+    cumulative = counts.to_numpy()[order].cumsum()
+    total = cumulative[-1]
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side="right")]
+    upper = values[np.searchsorted(cumulative, total // 2, side="right")]
+    return (lower + upper) / 2
+
+# Key Metrics in display order: (key in key_metrics, label, value format)
+KEY_METRICS = [
+    ("total", "Total Employees", "{}"),
+    ("left", "Employees Left", "{}"),
+    ("stayed", "Employees Stayed", "{}"),
+    ("salary_max", "Maximum Salary", "{:,.2f}"),
+    ("salary_min", "Minimum Salary", "{:,.2f}"),
+    ("salary_mean", "Average Salary", "{:,.2f}"),
+    ("tenure_mean", "Average Tenure", "{:.2f} yr"),
+    ("tenure_median", "Median Tenure", "{:.2f} yr"),
+]
+
+# Function to derive the Key Metrics from the aggregates
+def key_metrics(aggregates):
+    metrics = aggregates["key_metrics"]
+    tenure = aggregates["tenure_days"]
+    return {
+        "total": int(metrics["n"].sum()),
+        "left": int(metrics.loc[metrics["left"] == 1, "n"].sum()),
+        "stayed": int(metrics.loc[metrics["left"] == 0, "n"].sum()),
+        "salary_max": metrics["salary_max"].max(),
+        "salary_min": metrics["salary_min"].min(),
+        "salary_mean": metrics["salary_sum"].sum() / metrics["salary_count"].sum(),
+        "tenure_mean": (tenure["tenure_days"] * tenure["n"]).sum() / tenure["n"].sum() / 365,
+        "tenure_median": weighted_median(tenure["tenure_days"], tenure["n"]) / 365,
+    }
+
+# Note drawn in place of a chart that has no data for the filter selection
+NO_DATA_NOTE = "No data for the selected filters"
+
+# Whether a chart's column has anything to draw: a count above zero, or an average that is not missing
+def has_values(values):
+    return bool(values.fillna(0).any())
+
+# Function to draw a chart's title over empty axes with NO_DATA_NOTE, for a filter selection that
+# leaves the chart nothing to draw (no leavers, say). Pie charts cannot draw wedges that are all zero.
+def empty_chart(title, figsize):
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    ax.set_title(title)
+    ax.text(0.5, 0.5, NO_DATA_NOTE, ha="center", va="center", color="gray", transform=ax.transAxes)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    return fig
+
+# Visualization 1: Salary Distribution
+def chart_salary_distribution(aggregates):
+    salary_bins = aggregates["salary_histogram"]
+    if not has_values(salary_bins["n"]):
+        return empty_chart("Salary Distribution Among Employees", (6, 4))
+    column, bins = VISUALIZATION_AGGREGATES["salary_histogram"]["histogram"]
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    # Each bin's count is drawn at the bin's center, with numpy's edges for the same range
+    edges = np.histogram_bin_edges([salary_bins["salary_min"].min(), salary_bins["salary_max"].max()] if len(salary_bins) else [], bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    ax.hist(centers[salary_bins["salary_bin"].to_numpy(dtype=np.int64)], bins=edges, weights=salary_bins["n"], color="skyblue", edgecolor="black")
+    ax.set_title("Salary Distribution Among Employees")
+    ax.set_xlabel("Salary")
+    ax.set_ylabel("Number of Employees")
+    ax.grid(False)
+    return fig
+
+# Visualization 2: Average Salary by Job Title
+def chart_avg_salary_per_title(aggregates):
+    avg_salary_by_title = aggregates["avg_salary_by_title_unique"].sort_values("salary", ascending=False).reset_index(drop=True)
+    if not has_values(avg_salary_by_title["salary"]):
+        return empty_chart("Average Salary Per Title", (8, 4))
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    sns.barplot(x="title", y="salary", data=avg_salary_by_title, palette="viridis", ax=ax)
+    ax.set_title("Average Salary Per Title")
+    ax.set_xlabel("Job Title")
+    ax.set_ylabel("Average Salary")
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+    return fig
+
+# Visualization 3: Tenure Distribution
+def chart_tenure_distribution(aggregates):
+    tenure_days = aggregates["tenure_days"]
+    if not has_values(tenure_days["n"]):
+        return empty_chart("Tenure Distribution of Employees", (6, 4))
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    ax.hist(tenure_days["tenure_days"] / 365, weights=tenure_days["n"], color="skyblue", edgecolor="black")
+    ax.set_title("Tenure Distribution of Employees")
+    ax.set_xlabel("Tenure (Years)")
+    ax.set_ylabel("Number of Employees")
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+    return fig
+
+# Visualization 4: Employee Attrition Distribution
+def chart_attrition_distribution(aggregates):
+    if not has_values(aggregates["key_metrics"]["n"]):
+        return empty_chart("Employee Attrition Distribution", (2, 2))
+    metrics = key_metrics(aggregates)
+    result_df = pd.DataFrame({
+        "emp_status": ["Left", "Stayed"],
+        "no_of_emp": [metrics["left"], metrics["stayed"]]
+    })
+    colors = sns.color_palette("pastel")
+    fig = Figure(figsize=(2, 2))
+    ax = fig.subplots()
+    ax.pie(result_df["no_of_emp"], labels=result_df["emp_status"], autopct="%1.1f%%", colors=colors, startangle=140)
+    ax.set_title("Employee Attrition Distribution")
+    return fig
+
+# Visualization 5: Employee Attrition by Gender
+def chart_attrition_by_gender(aggregates):
+    left_by_gender = aggregates["attrition_by_gender"]
+    if not has_values(left_by_gender["n"]):
+        return empty_chart("Employee Attrition by Gender", (6, 4))
+    male_emp = int(left_by_gender.loc[left_by_gender["sex"] == "M", "n"].sum())
+    female_emp = int(left_by_gender.loc[left_by_gender["sex"] == "F", "n"].sum())
+    gen_df = pd.DataFrame({
+        "emp_gender": ["Male", "Female"],
+        "no_of_emp": [male_emp, female_emp]
+    })
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    sns.barplot(x="emp_gender", y="no_of_emp", data=gen_df, hue="emp_gender", legend=False, palette="coolwarm", ax=ax)
+    ax.set_xlabel("Gender")
+    ax.set_ylabel("Number of Employees Left")
+    ax.set_title("Employee Attrition by Gender")
+    return fig
+
+# Visualization 6: Employee Attrition by Job Title
+def chart_attrition_by_title(aggregates):
+    title_counts = aggregates["attrition_by_title"].copy()
+    if not has_values(title_counts["total_no"]):
+        return empty_chart("Employee Attrition by Job Title", (12, 6))
+    total_sum = title_counts["total_no"].sum()
+    title_counts["pct"] = title_counts["total_no"] * 100.0 / total_sum
+    title_counts_sorted = title_counts.sort_values(by="total_no", ascending=False)
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    sns.barplot(x="total_no", y="title", hue="title", data=title_counts_sorted, palette="viridis", ax=ax)
+    ax.set_xlabel("Total Count")
+    ax.set_ylabel("Job Title")
+    ax.set_title("Employee Attrition by Job Title")
+    for index, row in title_counts_sorted.iterrows():
+        ax.text(row["total_no"] + 100, index, f"{row['pct']:.2f}%", va="center", fontsize=9)
+    return fig
+
+# Visualization 7: Employee Attrition by Salary Range
+def chart_attrition_by_salary_range(aggregates):
+    salary_counts = aggregates["employees_by_salary_range"].copy()
+    if not has_values(salary_counts["NO_OF_EMP"]):
+        return empty_chart("Employee Attrition by Salary Range", (12, 6))
+    total_employees = salary_counts["NO_OF_EMP"].sum()
+    salary_counts["PCT"] = salary_counts["NO_OF_EMP"] * 100.0 / total_employees
+    salary_counts_sorted = salary_counts.sort_values("salary_range")
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    sns.barplot(data=salary_counts_sorted, x="salary_range", y="NO_OF_EMP", hue="salary_range", palette="viridis", ax=ax)
+    ax.set_title("Employee Attrition by Salary Range")
+    ax.set_xlabel("Salary Range")
+    ax.set_ylabel("Number of Employees")
+    ax2 = ax.twinx()
+    sns.lineplot(data=salary_counts_sorted, x="salary_range", y="PCT", ax=ax2, color="red", marker="o", label="Percentage", linewidth=2)
+    ax2.set_ylabel("Percentage of Total (%)", fontsize=12, color="red")
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment("right")
+    return fig
+
+# Visualization 8: Total Number of People and Percentage per Last Performance Rating
+def chart_attrition_by_rating(aggregates):
+    grouped_df = aggregates["attrition_by_rating"].copy()
+    if not has_values(grouped_df["total_no"]):
+        return empty_chart("Total Number of People and Percentage per Last Performance Rating", (12, 6))
+    total_count = grouped_df["total_no"].sum()
+    grouped_df["pct"] = (grouped_df["total_no"] * 100.0) / total_count
+    grouped_df = grouped_df.sort_values(by="total_no", ascending=False)
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    sns.barplot(x="Last_performance_rating", y="total_no", data=grouped_df, hue="Last_performance_rating", palette="viridis", ax=ax)
+    ax.set_title("Total Number of People and Percentage per Last Performance Rating", fontsize=16)
+    ax.set_xlabel("Last Performance Rating", fontsize=12)
+    ax.set_ylabel("Total Number of People", fontsize=12)
+    ax2 = ax.twinx()
+    sns.lineplot(x="Last_performance_rating", y="pct", data=grouped_df, ax=ax2, color="red", marker="o", label="Percentage", linewidth=2)
+    ax2.set_ylabel("Percentage of Total (%)", fontsize=12, color="red")
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+# Attrition by tenure group with percentages, shared by Visualizations 9 and 10
+def tenure_group_counts(aggregates):
+    grouped_df = aggregates["attrition_by_tenure_group"].copy()
+    grouped_df["PCT"] = (grouped_df["NO_OF_EMP"] * 100.00) / grouped_df["NO_OF_EMP"].sum()
+    return grouped_df
+
+# Visualization 9: Number of Employees by Tenure Group
+def chart_tenure_group_counts(aggregates):
+    grouped_df = tenure_group_counts(aggregates)
+    if not has_values(grouped_df["NO_OF_EMP"]):
+        return empty_chart("Number of Employees by Tenure Group", (10, 6))
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.barplot(x="tenure_group", y="NO_OF_EMP", data=grouped_df, hue="tenure_group", palette="viridis", ax=ax)
+    ax.set_title("Number of Employees by Tenure Group", fontsize=16)
+    ax.set_xlabel("Tenure Group", fontsize=14)
+    ax.set_ylabel("Number of Employees", fontsize=14)
+    ax.tick_params(axis="both", labelsize=12)
+    return fig
+
+# Visualization 10: Percentage of Employees by Tenure Group (Pie Chart)
+def chart_tenure_group_share(aggregates):
+    grouped_df = tenure_group_counts(aggregates)
+    if not has_values(grouped_df["NO_OF_EMP"]):
+        return empty_chart("Percentage of Employees by Tenure Group", (8, 8))
+    fig = Figure(figsize=(8, 8))
+    ax = fig.subplots()
+    ax.pie(
+        grouped_df["PCT"],
+        labels=grouped_df["tenure_group"],
+        autopct="%1.1f%%",
+        startangle=140,
+        colors=sns.color_palette("viridis", len(grouped_df)))
+    ax.set_title("Percentage of Employees by Tenure Group", fontsize=16)
+    return fig
+
+# Visualization 11: Number and Percentage of Employees by Age Group
+def chart_attrition_by_age_group(aggregates):
+    grouped_df = aggregates["attrition_by_age_group"].copy()
+    if not has_values(grouped_df["NO_OF_EMP"]):
+        return empty_chart("Number and Percentage of Employees by Age Group", (12, 6))
+    grouped_df["PCT"] = (grouped_df["NO_OF_EMP"] * 100.00) / grouped_df["NO_OF_EMP"].sum()
+
+    fig = Figure(figsize=(12, 6))
+    ax1 = fig.subplots()
+    sns.barplot(x="age_group", y="NO_OF_EMP", data=grouped_df, hue="age_group", palette="viridis", ax=ax1)
+    ax1.set_title("Number and Percentage of Employees by Age Group", fontsize=16)
+    ax1.set_xlabel("Age Group", fontsize=14)
+    ax1.set_ylabel("Number of Employees", fontsize=14)
+    ax1.tick_params(axis="x", labelsize=12)
+    ax1.tick_params(axis="y", labelsize=12)
+
+    ax2 = ax1.twinx()
+    sns.lineplot(x="age_group", y="PCT", data=grouped_df, color="red", marker="o", ax=ax2)
+    ax2.set_ylabel("Percentage (%)", fontsize=14)
+    ax2.tick_params(axis="y", labelsize=12)
+    return fig
+
+# Visualization 12: Number of Employees by Job Title
+def chart_employees_by_title(aggregates):
+    result = aggregates["employees_by_title"][["title", "total_emp"]]
+    if not has_values(result["total_emp"]):
+        return empty_chart("Number of Employees by Job Title", (10, 6))
+    result = result.sort_values(by="total_emp", ascending=False)
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.barplot(x="title", y="total_emp", data=result, hue="title", palette="viridis", ax=ax)
+    ax.set_title("Number of Employees by Job Title", fontsize=16)
+    ax.set_xlabel("Job Title", fontsize=14)
+    ax.set_ylabel("Number of Employees", fontsize=14)
+    ax.tick_params(axis="x", labelrotation=45, labelsize=12)
+    ax.tick_params(axis="y", labelsize=12)
+    for index, value in enumerate(result["total_emp"]):
+        ax.text(index, value + 0.1, str(value), ha="center", va="bottom", fontsize=12)
+    fig.tight_layout()
+    return fig
+
+# Visualization 13: Average Salary by Job Title
+def chart_avg_salary_by_title(aggregates):
+    result = aggregates["employees_by_title"][["title", "avg_sal"]]
+    if not has_values(result["avg_sal"]):
+        return empty_chart("Average Salary by Job Title", (10, 6))
+    result = result.sort_values(by="avg_sal", ascending=False)
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.barplot(x="title", y="avg_sal", data=result, hue="title", palette="viridis", ax=ax)
+    ax.set_title("Average Salary by Job Title", fontsize=16)
+    ax.set_xlabel("Job Title", fontsize=14)
+    ax.set_ylabel("Average Salary", fontsize=14)
+    ax.tick_params(axis="x", labelrotation=45, labelsize=12)
+    ax.tick_params(axis="y", labelsize=12)
+    for index, value in enumerate(result["avg_sal"]):
+        ax.text(index, value + 500, f"{value:.2f}", ha="center", va="bottom", fontsize=12)
+    fig.tight_layout()
+    return fig
+
+# Visualization 14: Number of Employees Hired by Year
+def chart_hires_by_year(aggregates):
+    result = aggregates["hires_by_year"][["hire_year", "employee_count"]]
+    if not has_values(result["employee_count"]):
+        return empty_chart("Number of Employees Hired by Year", (10, 6))
+    result = result.sort_values(by="hire_year")
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.lineplot(x="hire_year", y="employee_count", data=result, marker="o", color="blue", ax=ax)
+    ax.set_title("Number of Employees Hired by Year", fontsize=16)
+    ax.set_xlabel("Year", fontsize=14)
+    ax.set_ylabel("Number of Employees", fontsize=14)
+    ax.tick_params(axis="both", labelsize=12)
+    for index, row in result.iterrows():
+        ax.text(row["hire_year"], row["employee_count"] + 0.1, str(row["employee_count"]), ha="center", va="bottom", fontsize=12)
+    ax.grid(False)
+    fig.tight_layout()
+    return fig
+
+# Visualization 15: Number of Exits per Year
+def chart_exits_by_year(aggregates):
+    exit_counts_sorted = aggregates["exits_by_year"].sort_values(by="exit_year").reset_index(drop=True)
+    if not has_values(exit_counts_sorted["total_exits"]):
+        return empty_chart("Number of Exits per Year", (6, 4))
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    sns.lineplot(data=exit_counts_sorted, x="exit_year", y="total_exits", marker="o", color="blue", ax=ax)
+    ax.set_title("Number of Exits per Year", fontsize=16)
+    ax.set_xlabel("Exit Year", fontsize=12)
+    ax.set_ylabel("Total Exits", fontsize=12)
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+# Visualization 16: Average Salary by Hire Year
+def chart_avg_salary_by_hire_year(aggregates):
+    result = aggregates["hires_by_year"][["hire_year", "avg_salary"]]
+    if not has_values(result["avg_salary"]):
+        return empty_chart("Average Salary by Hire Year", (6, 4))
+    result = result.sort_values(by="hire_year")
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    sns.lineplot(data=result, x="hire_year", y="avg_salary", marker="o", color="green", ax=ax)
+    ax.set_title("Average Salary by Hire Year", fontsize=16)
+    ax.set_xlabel("Hire Year", fontsize=12)
+    ax.set_ylabel("Average Salary", fontsize=12)
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+    return fig
+
+# Visualization 17: Gender Distribution in the Company
+def chart_gender_distribution(aggregates):
+    by_gender = aggregates["employees_by_gender"]
+    female_count = int(by_gender.loc[by_gender["sex"] == "F", "total_no"].sum())
+    male_count = int(by_gender.loc[by_gender["sex"] == "M", "total_no"].sum())
+    if not female_count + male_count:
+        return empty_chart("Gender Distribution in the Company", (3, 3))
+    gender_counts = pd.DataFrame({
+        "gender": ["Female", "Male"],
+        "total_no": [female_count, male_count]
+    })
+    fig = Figure(figsize=(3, 3))
+    ax = fig.subplots()
+    ax.pie(gender_counts["total_no"], labels=gender_counts["gender"], autopct="%1.1f%%", startangle=90, colors=["#ff9999", "#66b3ff"])
+    ax.set_title("Gender Distribution in the Company", fontsize=16)
+    ax.axis("equal")
+    fig.tight_layout()
+    return fig
+
+# Charts in page order: (chart id, header, figure builder)
+CHARTS = [
+    ("salary_distribution", "📊 Salary Distribution Among Employees", chart_salary_distribution),
+    ("avg_salary_per_title", "📊 Average Salary Per Title", chart_avg_salary_per_title),
+    ("tenure_distribution", "📊 Tenure Distribution of Employees", chart_tenure_distribution),
+    ("attrition_distribution", "📊 Employee Attrition Distribution", chart_attrition_distribution),
+    ("attrition_by_gender", "📊 Employee Attrition by Gender", chart_attrition_by_gender),
+    ("attrition_by_title", "📊 Employee Attrition by Job Title", chart_attrition_by_title),
+    ("attrition_by_salary_range", "📊 Employee Attrition by Salary Range", chart_attrition_by_salary_range),
+    ("attrition_by_rating", "📊 Total Number of People and Percentage per Last Performance Rating", chart_attrition_by_rating),
+    ("tenure_group_counts", "📊 Number of Employees by Tenure Group", chart_tenure_group_counts),
+    ("tenure_group_share", "📊 Percentage of Employees by Tenure Group", chart_tenure_group_share),
+    ("attrition_by_age_group", "📊 Number and Percentage of Employees who left by Age Group", chart_attrition_by_age_group),
+    ("employees_by_title", "📊 Number of Employees by Job Title", chart_employees_by_title),
+    ("avg_salary_by_title", "📊 Average Salary by Job Title", chart_avg_salary_by_title),
+    ("hires_by_year", "📊 Number of Employees Hired by Year", chart_hires_by_year),
+    ("exits_by_year", "📊 Number of Exits per Year", chart_exits_by_year),
+    ("avg_salary_by_hire_year", "📊 Average Salary by Hire Year", chart_avg_salary_by_hire_year),
+    ("gender_distribution", "📊 Gender Distribution in the Company", chart_gender_distribution),
+]
+CHART_BUILDERS = {chart_id: build for chart_id, header, build in CHARTS}
+CHART_HEADERS = {chart_id: header for chart_id, header, build in CHARTS}
+
+# The aggregates each chart's builder reads
+CHART_AGGREGATES = {
+    "salary_distribution": ["salary_histogram"],
+    "avg_salary_per_title": ["avg_salary_by_title_unique"],
+    "tenure_distribution": ["tenure_days"],
+    "attrition_distribution": ["key_metrics", "tenure_days"],
+    "attrition_by_gender": ["attrition_by_gender"],
+    "attrition_by_title": ["attrition_by_title"],
+    "attrition_by_salary_range": ["employees_by_salary_range"],
+    "attrition_by_rating": ["attrition_by_rating"],
+    "tenure_group_counts": ["attrition_by_tenure_group"],
+    "tenure_group_share": ["attrition_by_tenure_group"],
+    "attrition_by_age_group": ["attrition_by_age_group"],
+    "employees_by_title": ["employees_by_title"],
+    "avg_salary_by_title": ["employees_by_title"],
+    "hires_by_year": ["hires_by_year"],
+    "exits_by_year": ["exits_by_year"],
+    "avg_salary_by_hire_year": ["hires_by_year"],
+    "gender_distribution": ["employees_by_gender"],
+}
+
+# Function to pick out the aggregates a chart reads, so a worker process is sent only those
+def chart_inputs(chart_id, aggregates):
+    return {name: aggregates[name] for name in CHART_AGGREGATES[chart_id]}
+
+# Dashboard sections (tabs) and the charts shown in each
+CHART_SECTIONS = {
+    "💰 Compensation": ["salary_distribution", "avg_salary_per_title", "avg_salary_by_title", "avg_salary_by_hire_year"],
+    "🚪 Attrition": ["attrition_distribution", "attrition_by_gender", "attrition_by_title", "attrition_by_salary_range", "attrition_by_rating"],
+    "⏳ Tenure/Age": ["tenure_distribution", "tenure_group_counts", "tenure_group_share", "attrition_by_age_group"],
+    "📅 Hiring trends": ["hires_by_year", "exits_by_year"],
+    "👥 Demographics": ["employees_by_title", "gender_distribution"],
+}
+
+# Widest PNG Streamlit displays without resizing (and re-encoding) it on every rerun
+CHART_MAX_WIDTH_PX = 1400
+
+# Function to draw one chart to PNG (or SVG) bytes. The Figure is created without pyplot, so it is
+# never registered in pyplot's global figure list and is freed as soon as it goes out of scope.
+def render_chart(chart_id, aggregates, image_format="png"):
+    fig = CHART_BUILDERS[chart_id](aggregates)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=image_format, dpi=min(200, CHART_MAX_WIDTH_PX / fig.get_figwidth()), bbox_inches="tight")
+    return buffer.getvalue()
+
+# Function to draw one chart to PNG bytes
+def render_chart_png(chart_id, aggregates):
+    return render_chart(chart_id, aggregates, "png")
+
+# Single render cache for the whole server process
+@st.cache_resource
+def get_render_cache():
+    return QueryCache(RENDER_CACHE_TTL_SECONDS, RENDER_CACHE_MAX_BYTES)
+
+# This file imported as a regular module, so worker processes can unpickle its functions
+# (under `streamlit run` the script itself executes as __main__)
+def dashboard_module():
+    return importlib.import_module(os.path.splitext(os.path.basename(__file__))[0])
+
+# Renders charts in worker processes (matplotlib is not thread-safe) and stores the PNGs
+# in the render cache; a chart requested while still in flight waits for its worker.
+# Each queued chart counts the sessions that want it, and a chart no session wants any more
+# is cancelled if its worker has not started on it yet.
+class BackgroundRenderer:
+    def __init__(self, cache, max_workers):
+        self.cache = cache
+        self.max_workers = max_workers
+        self._pool = None
+        self._pending = {}
+        self._wanted = {}
+        self._lock = threading.Lock()
+
+    # Queues the chart for key, or joins the render already queued for it. Returns whether the
+    # caller now holds a claim on it (to give back with release).
+    def submit(self, chart_id, aggregates, key):
+        with self._lock:
+            if key in self._pending:
+                self._wanted[key] += 1
+                return True
+            if self.cache.get(key) is not None:
+                return False
+            try:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+                future = self._pool.submit(dashboard_module().render_chart_png, chart_id, aggregates)
+            except Exception:
+                # Without workers the chart is simply drawn when its section is opened
+                return False
+            self._pending[key] = future
+            self._wanted[key] = 1
+        future.add_done_callback(lambda done: self._store(key, done))
+        return True
+
+    def release(self, keys):
+        unwanted = []
+        with self._lock:
+            for key in keys:
+                if key in self._wanted:
+                    self._wanted[key] -= 1
+                    if not self._wanted[key]:
+                        unwanted.append(self._pending[key])
+        # Outside the lock: cancelling runs _store right away
+        for future in unwanted:
+            future.cancel()
+
+    def pending(self, key):
+        with self._lock:
+            return self._pending.get(key)
+
+    def _store(self, key, future):
+        if not future.cancelled() and future.exception() is None:
+            png = future.result()
+            self.cache.put(key, png, len(png))
+        with self._lock:
+            self._pending.pop(key, None)
+            self._wanted.pop(key, None)
+
+# Single background renderer for the whole server process
+@st.cache_resource
+def get_background_renderer():
+    return BackgroundRenderer(get_render_cache(), RENDER_WORKERS)
+
+# Function to get a chart's PNG, drawn only once per chart, data version and filter selection
+def cached_chart_png(chart_id, aggregates, version, filters=()):
+    key = (chart_id, version, filters)
+
+    def load(previous):
+        # Includes waiting for a background worker that is already drawing the chart
+        with record_stage(f"render:{chart_id}"):
+            future = get_background_renderer().pending(key)
+            if future is not None:
+                try:
+                    return future.result(), {}
+                except Exception:
+                    pass
+            return render_chart_png(chart_id, aggregates), {}
+
+    return get_render_cache().get_or_load(key, load, len).value
+
+# Function to queue the charts of every section except the open one for background rendering.
+# When the session's data version or filter selection changes, the charts it queued for the
+# previous one are released, so renders nobody will look at are cancelled.
+def prerender_sections(open_section, aggregates, version, filters=()):
+    renderer = get_background_renderer()
+    selection, queued = st.session_state.get("prerendered", (None, set()))
+    if selection != (version, filters):
+        renderer.release(queued)
+        queued = set()
+    for section, chart_ids in CHART_SECTIONS.items():
+        if section != open_section:
+            for chart_id in chart_ids:
+                key = (chart_id, version, filters)
+                if key not in queued and renderer.submit(chart_id, chart_inputs(chart_id, aggregates), key):
+                    queued.add(key)
+    st.session_state.prerendered = ((version, filters), queued)
+
+# Sidebar filter widgets with options from the unfiltered aggregates. Returns the selection as
+# ((column, values), ...), leaving out filters that select everything.
+def sidebar_filters(aggregates, disabled=False):
+    st.sidebar.header("🔍 Filters")
+    st.sidebar.markdown("Use the filters below to customize the data displayed.")
+    note = "Filters are not available while streaming: the table's rows are not kept in memory." if disabled else None
+    filters = []
+
+    def choose(label, column, options):
+        options = [to_query_param(value) for value in options if pd.notna(value)]
+        selected = st.sidebar.multiselect(label, options, key=f"filter_{column}", placeholder="All", disabled=disabled, help=note)
+        if selected and len(selected) < len(options):
+            filters.append((column, tuple(selected)))
+
+    choose("Title", "title", aggregates["employees_by_title"]["title"])
+    choose("Gender", "sex", aggregates["employees_by_gender"]["sex"])
+
+    status = st.sidebar.radio("Employment status", ["All", "Left", "Stayed"], horizontal=True, key="filter_left", disabled=disabled, help=note)
+    if status != "All":
+        filters.append(("left", (1 if status == "Left" else 0,)))
+
+    years = [int(year) for year in aggregates["hires_by_year"]["hire_year"].dropna()]
+    if len(years) > 1:
+        first, last = min(years), max(years)
+        low, high = st.sidebar.slider("Hire year", first, last, (first, last), key="filter_hire_year", disabled=disabled, help=note)
+        if (low, high) != (first, last):
+            filters.append(("hire_year", tuple(year for year in years if low <= year <= high)))
+
+    # Salary ranges in bin order rather than alphabetical
+    present = set(aggregates["employees_by_salary_range"]["salary_range"])
+    labels = [label for label, low, high, closed in SALARY_RANGE_BINS] + [SALARY_RANGE_DEFAULT]
+    choose("Salary range", "salary_range", [label for label in labels if label in present])
+    choose("Performance rating", "Last_performance_rating", aggregates["employees_by_rating"]["Last_performance_rating"])
+    return () if disabled else tuple(filters)
+
+# Function to describe an age in seconds as "45s", "12 min" or "3.5 h"
+def format_age(seconds):
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+# Function to show when the data was fetched and, for refreshed tables, whether a newer version
+# is on its way; data older than STALE_AFTER_SECONDS is flagged as stale
+def show_data_freshness(fetched_at, status=None):
+    age = max(time.time() - fetched_at, 0)
+    text = f"Data as of {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(fetched_at))} ({format_age(age)} ago)"
+    if status is not None and status["refreshing"]:
+        text += " · 🔄 refreshing in the background"
+    st.caption(text)
+    if age > STALE_AFTER_SECONDS:
+        message = f"⚠️ Stale data: last updated {format_age(age)} ago."
+        if status is not None and status["error"]:
+            message += f" The last background refresh failed: {status['error']}"
+        st.warning(message)
 
 # Login Page
 def login_page():
@@ -49,36 +2523,160 @@ def main_dashboard():
 
     # Sidebar for SQL Server connection details
     st.sidebar.header("🔍 SQL Server Connection")
+    source = st.sidebar.radio(
+        "Data source",
+        ["SQL Server", "Snapshot file"],
+        horizontal=True,
+        help="Render from a local Parquet/Arrow snapshot without connecting to a database.",
+    )
     server = st.sidebar.text_input("Server Name", "DESKTOP-CBADVFM\SQLEXPRESS")
     database = st.sidebar.text_input("Database Name", "DE_CAPSTONE_PROJECT")
 
-    # Connect to SQL Server
-    if st.sidebar.button("Connect to SQL Server"):
-        with st.spinner("Connecting to SQL Server..."):
-            conn = connect_to_sql_server(server, database)
-            if conn:
-                st.success("Connected to SQL Server successfully!")
-                st.session_state.conn = conn  # Save connection in session state
+    if source == "Snapshot file":
+        snapshot_file = st.sidebar.text_input("Snapshot file", snapshot_path(server, database))
+    else:
+        # Keep a local snapshot so cold starts render without waiting for the database
+        use_snapshot = st.sidebar.checkbox(
+            "Keep local snapshot",
+            value=pa is not None and not SHARED_DATASET,
+            disabled=pa is None or SHARED_DATASET,
+            help="Save each load to a local Arrow file and start from it while it is fresh (requires pyarrow).",
+        )
 
-    # Fetch data from SQL Server
-    if "conn" in st.session_state:
-        st.sidebar.header("🔍 Filters")
-        st.sidebar.markdown("Use the filters below to customize the data displayed.")
+        # Connect to SQL Server (checks that the shared pool can hand out a working connection)
+        if st.sidebar.button("Connect to SQL Server"):
+            with st.spinner("Connecting to SQL Server..."):
+                try:
+                    with record_stage("connect"), get_connection_pool(server, database).connection():
+                        pass
+                    st.success("Connected to SQL Server successfully!")
+                    st.session_state.connected = (server, database)  # Save the connected database in session state
+                except Exception as e:
+                    st.error(f"Error connecting to SQL Server: {e}")
+                    st.error("Please verify the server name, database name, and your permissions.")
 
-        # Fetch data from SQL Server
-        query = "SELECT * FROM final_table"  # Replace with your table name
-        df = fetch_data(st.session_state.conn, query)
+    # Fetch data from SQL Server or the snapshot file
+    if source == "Snapshot file" or "connected" in st.session_state:
+        if source == "SQL Server":
+            server, database = st.session_state.connected
+            pool = get_connection_pool(server, database)
 
-        if df is not None:
-            # Convert date columns to datetime (if applicable)
-            if "hire_date" in df.columns:
-                df["hire_date"] = pd.to_datetime(df["hire_date"])
-            if "last_date" in df.columns:
-                df["last_date"] = pd.to_datetime(df["last_date"])
+        aggregate_in_sql = incremental = streaming = False
+        if source == "SQL Server":
+            # Aggregate in SQL Server: only the grouped results cross the network
+            aggregate_in_sql = st.sidebar.checkbox(
+                "Aggregate in SQL Server",
+                value=False,
+                help="Run every chart's aggregate on the server, in one query, instead of loading the whole table.",
+            )
+
+            # Incremental refresh: re-read only rows changed since the last load
+            incremental = st.sidebar.checkbox(
+                "Incremental refresh",
+                value=False,
+                disabled=aggregate_in_sql or SHARED_DATASET,
+                help="Fetch only new or changed employees on refresh; a full reload still runs periodically to catch deletes.",
+            )
+
+            # Streaming: aggregate the table chunk by chunk instead of loading it whole
+            streaming = st.sidebar.checkbox(
+                "Stream in chunks",
+                value=False,
+                disabled=aggregate_in_sql or incremental or SHARED_DATASET,
+                help="Read the table in chunks and keep only the aggregates, for tables too large to load into memory. No local snapshot is kept.",
+            )
+
+        # Refresh data (bypass the shared cache; in the background when the refresher keeps the table)
+        refresh = st.sidebar.button("🔄 Refresh data")
+        if refresh and aggregate_in_sql:
+            refresh_cached_data(server, database)
+
+        # The background refresher reloads the table on a timer; until a reload is swapped in,
+        # pages keep being served the current (even expired) version
+        refresher = None
+        if REFRESH_INTERVAL_SECONDS > 0 and source == "SQL Server" and not aggregate_in_sql:
+            refresher = get_background_refresher()
+        refresh_status = None
+
+        # Fetch data (served from the shared cache when fresh)
+        if aggregate_in_sql:
+            aggregates, fetched_at, version = fetch_aggregates(pool, server, database)
+        else:
+            if source == "Snapshot file":
+                entry = fetch_snapshot_file(snapshot_file, force=refresh)
+                if entry is None:
+                    st.error(f"Snapshot file not found or unreadable: {snapshot_file}")
+            elif SHARED_DATASET and pa is not None:
+                entry = fetch_table_shared(
+                    pool,
+                    server,
+                    database,
+                    force=refresh and refresher is None,
+                    prepare=prepare_entry,
+                    stale_ok=refresher is not None,
+                )
+                reload = lambda: fetch_table_shared(pool, server, database, force=True, prepare=prepare_entry)
+            elif streaming:
+                progress_bar = st.progress(0.0, text="Loading data...")
+                entry = fetch_table_streaming(
+                    pool,
+                    server,
+                    database,
+                    force=refresh and refresher is None,
+                    progress=lambda done, total: progress_bar.progress(
+                        min(done / max(total, 1), 1.0), text=f"Loaded {done:,} of {total:,} rows"
+                    ),
+                    prepare=prepare_entry,
+                    stale_ok=refresher is not None,
+                )
+                progress_bar.empty()
+                reload = lambda: fetch_table_streaming(pool, server, database, force=True, prepare=prepare_entry)
+            else:
+                table_snapshot = snapshot_path(server, database) if use_snapshot else None
+                entry = fetch_table(
+                    pool,
+                    server,
+                    database,
+                    incremental=incremental,
+                    snapshot_file=table_snapshot,
+                    force=refresh and refresher is None,
+                    prepare=prepare_entry,
+                    stale_ok=refresher is not None,
+                )
+                reload = lambda: fetch_table(
+                    pool, server, database, incremental=incremental, snapshot_file=table_snapshot, force=True, prepare=prepare_entry
+                )
+            if refresher is not None and entry is not None:
+                # One job per cached table, whichever session settings reload it
+                refresher.watch(entry.key, reload, entry.fetched_at)
+                if refresh:
+                    refresher.refresh_now(entry.key)
+                    st.toast("Refreshing data in the background...")
+                refresh_status = refresher.status(entry.key)
+            aggregates = fetched_at = version = None
+            if entry is not None:
+                # Derived columns and the aggregate cube are built once per loaded version of the data
+                cube, aggregates = prepare_entry(entry)
+                fetched_at = entry.fetched_at
+                version = entry.version
+
+        # Sidebar filters (options from the unfiltered data), applied to every metric and chart
+        filters = ()
+        if aggregates is not None:
+            filters = sidebar_filters(aggregates, disabled=streaming)
+            if filters:
+                if aggregate_in_sql:
+                    aggregates, fetched_at, version = fetch_aggregates(pool, server, database, filters)
+                else:
+                    aggregates = compute_aggregates(cube, filters)
+                if aggregates is not None and aggregates["key_metrics"]["n"].sum() == 0:
+                    st.warning("No employees match the selected filters.")
+                    aggregates = None
 
-            # Calculate tenure (in years)
-            if "hire_date" in df.columns and "last_date" in df.columns:
-                df["tenure"] = (df["last_date"].fillna(pd.Timestamp.today()) - df["hire_date"]).dt.days / 365
+        if aggregates is not None:
+            show_data_freshness(fetched_at, refresh_status)
+            with record_stage("key_metrics"):
+                metrics = key_metrics(aggregates)
 
             # Custom CSS to reduce font size of metrics
             st.markdown("""
@@ -89,346 +2687,147 @@ def main_dashboard():
                 </style>
                 """, unsafe_allow_html=True)
 
-            # Display key metrics
+            # Display key metrics, four per row
             st.header("📈 Key Metrics")
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Total Employees", df.shape[0])
-            with col2:
-                st.metric("Employees Left", df[df["left"] == 1].shape[0])
-            with col3:
-                st.metric("Employees Stayed", df[df["left"] == 0].shape[0])
-            with col4:
-                st.metric("Maximum Salary", f"{df['salary'].max():,.2f}")
-
-            col5, col6, col7, col8 = st.columns(4)
-            with col5:
-                st.metric("Minimum Salary", f"{df['salary'].min():,.2f}")
-            with col6:
-                st.metric("Average Salary", f"{df['salary'].mean():,.2f}")
-            with col7:
-                st.metric("Average Tenure", f"{df['tenure'].mean():.2f} yr")
-            with col8:
-                st.metric("Median Tenure", f"{df['tenure'].median():.2f} yr")
-
-            # Visualization 1: Salary Distribution
-            st.header("📊 Salary Distribution Among Employees")
-            plt.figure(figsize=(6, 4))
-            plt.hist(df["salary"], bins=5, color="skyblue", edgecolor="black")
-            plt.title("Salary Distribution Among Employees")
-            plt.xlabel("Salary")
-            plt.ylabel("Number of Employees")
-            plt.grid(False)
-            st.pyplot(plt)
-
-            # Visualization 2: Average Salary by Job Title
-            st.header("📊 Average Salary Per Title")
-            unique_employees = df.drop_duplicates(subset="emp_no")
-            avg_salary_by_title = unique_employees.groupby("title")["salary"].mean().sort_values(ascending=False).reset_index()
-            plt.figure(figsize=(8, 4))
-            sns.barplot(x="title", y="salary", data=avg_salary_by_title, palette="viridis")
-            plt.title("Average Salary Per Title")
-            plt.xlabel("Job Title")
-            plt.ylabel("Average Salary")
-            plt.xticks(rotation=45)
-            plt.grid(axis="y", linestyle="--", alpha=0.7)
-            st.pyplot(plt)
-
-            # Visualization 3: Tenure Distribution
-            st.header("📊 Tenure Distribution of Employees")
-            plt.figure(figsize=(6, 4))
-            plt.hist(df["tenure"], color="skyblue", edgecolor="black")
-            plt.title("Tenure Distribution of Employees")
-            plt.xlabel("Tenure (Years)")
-            plt.ylabel("Number of Employees")
-            plt.grid(axis="y", linestyle="--", alpha=0.7)
-            st.pyplot(plt)
-
-            # Visualization 4: Employee Attrition Distribution
-            st.header("📊 Employee Attrition Distribution")
-            emp_left = df[df["left"] == 1].shape[0]
-            emp_stayed = df[df["left"] == 0].shape[0]
-            result_df = pd.DataFrame({
-                "emp_status": ["Left", "Stayed"],
-                "no_of_emp": [emp_left, emp_stayed]
-            })
-            result_df["percntg"] = (result_df["no_of_emp"] * 100.00) / result_df["no_of_emp"].sum()
-            colors = sns.color_palette("pastel")
-            plt.figure(figsize=(2,2))
-            plt.pie(result_df["no_of_emp"], labels=result_df["emp_status"], autopct="%1.1f%%", colors=colors, startangle=140)
-            plt.title("Employee Attrition Distribution")
-            st.pyplot(plt)
-
-            # Visualization 5: Employee Attrition by Gender
-            st.header("📊 Employee Attrition by Gender")
-            male_emp = df[(df["left"] == 1) & (df["sex"] == "M")].shape[0]
-            female_emp = df[(df["left"] == 1) & (df["sex"] == "F")].shape[0]
-            gen_df = pd.DataFrame({
-                "emp_gender": ["Male", "Female"],
-                "no_of_emp": [male_emp, female_emp]
-            })
-            plt.figure(figsize=(6, 4))
-            sns.barplot(x="emp_gender", y="no_of_emp", data=gen_df, hue="emp_gender", legend=False, palette="coolwarm")
-            plt.xlabel("Gender")
-            plt.ylabel("Number of Employees Left")
-            plt.title("Employee Attrition by Gender")
-            st.pyplot(plt)
-
-            # Visualization 6: Employee Attrition by Job Title
-            st.header("📊 Employee Attrition by Job Title")
-            df_filtered = df[df["left"] == 1]
-            title_counts = df_filtered.groupby("title").size().reset_index(name="total_no")
-            total_sum = title_counts["total_no"].sum()
-            title_counts["pct"] = title_counts["total_no"] * 100.0 / total_sum
-            title_counts_sorted = title_counts.sort_values(by="total_no", ascending=False)
-            plt.figure(figsize=(12, 6))
-            sns.barplot(x="total_no", y="title", hue="title", data=title_counts_sorted, palette="viridis")
-            plt.xlabel("Total Count")
-            plt.ylabel("Job Title")
-            plt.title("Employee Attrition by Job Title")
-            for index, row in title_counts_sorted.iterrows():
-                plt.text(row["total_no"] + 100, index, f"{row['pct']:.2f}%", va="center", fontsize=9)
-            st.pyplot(plt)
-
-            # Visualization 7: Employee Attrition by Salary Range
-            st.header("📊 Employee Attrition by Salary Range")
-            def get_salary_range(salary):
-                if 40000 <= salary <= 60000:
-                    return "40k-60k"
-                elif 60001 <= salary <= 80000:
-                    return "60k-80k"
-                elif 80001 <= salary <= 100000:
-                    return "80k-100k"
-                elif 100001 <= salary <= 129492:
-                    return "100k-130k"
-                else:
-                    return "Unknown"
-            df["salary_range"] = df["salary"].apply(get_salary_range)
-            salary_counts = df.groupby("salary_range")["emp_no"].count().reset_index(name="NO_OF_EMP")
-            total_employees = salary_counts["NO_OF_EMP"].sum()
-            salary_counts["PCT"] = salary_counts["NO_OF_EMP"] * 100.0 / total_employees
-            salary_counts_sorted = salary_counts.sort_values("salary_range")
-            plt.figure(figsize=(12, 6))
-            sns.barplot(data=salary_counts_sorted, x="salary_range", y="NO_OF_EMP", hue="salary_range", palette="viridis")
-            plt.title("Employee Attrition by Salary Range")
-            plt.xlabel("Salary Range")
-            plt.ylabel("Number of Employees")
-            ax2 = plt.gca().twinx()
-            sns.lineplot(data=salary_counts_sorted, x="salary_range", y="PCT", ax=ax2, color="red", marker="o", label="Percentage", linewidth=2)
-            ax2.set_ylabel("Percentage of Total (%)", fontsize=12, color="red")
-            plt.xticks(rotation=45, ha="right")
-            st.pyplot(plt)
-
-            # Visualization 8: Total Number of People and Percentage per Last Performance Rating
-            st.header("📊 Total Number of People and Percentage per Last Performance Rating")
-            filtered_df = df[df["left"] == 1]
-            grouped_df = filtered_df.groupby("Last_performance_rating").size().reset_index(name="total_no")
-            total_count = grouped_df["total_no"].sum()
-            grouped_df["pct"] = (grouped_df["total_no"] * 100.0) / total_count
-            grouped_df = grouped_df.sort_values(by="total_no", ascending=False)
-            plt.figure(figsize=(12, 6))
-            sns.barplot(x="Last_performance_rating", y="total_no", data=grouped_df, hue="Last_performance_rating", palette="viridis")
-            plt.title("Total Number of People and Percentage per Last Performance Rating", fontsize=16)
-            plt.xlabel("Last Performance Rating", fontsize=12)
-            plt.ylabel("Total Number of People", fontsize=12)
-            ax2 = plt.gca().twinx()
-            sns.lineplot(x="Last_performance_rating", y="pct", data=grouped_df, ax=ax2, color="red", marker="o", label="Percentage", linewidth=2)
-            ax2.set_ylabel("Percentage of Total (%)", fontsize=12, color="red")
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            st.pyplot(plt)
-
-            # Visualization 9: Number of Employees by Tenure Group
-            st.header("📊 Number of Employees by Tenure Group")
-            filtered_df = df[df["left"] == 1]
-            def tenure_group(tenure):
-                if 1 <= tenure <= 4:
-                    return "Low Tenure(>=1 to <=4)"
-                elif 4 < tenure <= 8:
-                    return "Medium Tenure(>4 to <=8)"
-                else:
-                    return "High Tenure(>8 to <=14)"
-            filtered_df["tenure_group"] = filtered_df["tenure"].apply(tenure_group)
-            grouped_df = filtered_df.groupby("tenure_group").size().reset_index(name="NO_OF_EMP")
-            grouped_df["PCT"] = (grouped_df["NO_OF_EMP"] * 100.00) / grouped_df["NO_OF_EMP"].sum()
-            plt.figure(figsize=(10, 6))
-            sns.barplot(x="tenure_group", y="NO_OF_EMP", data=grouped_df, hue="tenure_group", palette="viridis")
-            plt.title("Number of Employees by Tenure Group", fontsize=16)
-            plt.xlabel("Tenure Group", fontsize=14)
-            plt.ylabel("Number of Employees", fontsize=14)
-            plt.xticks(fontsize=12)
-            plt.yticks(fontsize=12)
-            st.pyplot(plt)
-
-            # Visualization 10: Percentage of Employees by Tenure Group (Pie Chart)
-            st.header("📊 Percentage of Employees by Tenure Group")
-            plt.figure(figsize=(8, 8))
-            plt.pie(
-                grouped_df["PCT"],
-                labels=grouped_df["tenure_group"],
-                autopct="%1.1f%%",
-                startangle=140,
-                colors=sns.color_palette("viridis", len(grouped_df)))
-            plt.title("Percentage of Employees by Tenure Group", fontsize=16)
-            st.pyplot(plt)
-
-            # Visualization 11: Number and Percentage of Employees by Age Group
-            st.header("📊 Number and Percentage of Employees who left by Age Group")
-         
-          
-            df['hire_date'] = pd.to_datetime(df['birth_date'])
-            df['last_date'] = pd.to_datetime(df['last_date'])
-
-            df['birth_date'] = pd.to_datetime(df['birth_date'])
-
-         
-            df['age'] = ((df['last_date'].fillna(pd.Timestamp.today()) - df['birth_date']).dt.days )/ 365
-
-         
-            filtered_df = df[df["left"] == 1]
-
-            def age_group(age):
-                if 21 <= age <= 30:
-                    return "21-30"
-                elif 30 < age <= 40:
-                    return "31-40"
-                elif 40 < age <= 50:
-                    return "41-50"
-                elif 50 < age <= 60:
-                    return "51-60"
-                else:
-                    return ">60"
-
-            
-            filtered_df["age_group"] = filtered_df["age"].apply(age_group)
-
-          
-            grouped_df = filtered_df.groupby("age_group").size().reset_index(name="NO_OF_EMP")
-            grouped_df["PCT"] = (grouped_df["NO_OF_EMP"] * 100.00) / grouped_df["NO_OF_EMP"].sum()
-
-            fig, ax1 = plt.subplots(figsize=(12, 6))
-            sns.barplot(x="age_group", y="NO_OF_EMP", data=grouped_df, hue="age_group", palette="viridis", ax=ax1)
-            ax1.set_title("Number and Percentage of Employees by Age Group", fontsize=16)
-            ax1.set_xlabel("Age Group", fontsize=14)
-            ax1.set_ylabel("Number of Employees", fontsize=14)
-            ax1.tick_params(axis="x", labelsize=12)
-            ax1.tick_params(axis="y", labelsize=12)
-
-            ax2 = ax1.twinx()
-            sns.lineplot(x="age_group", y="PCT", data=grouped_df, color="red", marker="o", ax=ax2)
-            ax2.set_ylabel("Percentage (%)", fontsize=14)
-            ax2.tick_params(axis="y", labelsize=12)
-
-            st.pyplot(fig)
-        
-
-            # Visualization 12: Number of Employees by Job Title
-            st.header("📊 Number of Employees by Job Title")
-            result = df.groupby("title").size().reset_index(name="total_emp")
-            result = result.sort_values(by="total_emp", ascending=False)
-            plt.figure(figsize=(10, 6))
-            sns.barplot(x="title", y="total_emp", data=result, hue="title", palette="viridis")
-            plt.title("Number of Employees by Job Title", fontsize=16)
-            plt.xlabel("Job Title", fontsize=14)
-            plt.ylabel("Number of Employees", fontsize=14)
-            plt.xticks(rotation=45, fontsize=12)
-            plt.yticks(fontsize=12)
-            for index, value in enumerate(result["total_emp"]):
-                plt.text(index, value + 0.1, str(value), ha="center", va="bottom", fontsize=12)
-            plt.tight_layout()
-            st.pyplot(plt)
-
-            # Visualization 13: Average Salary by Job Title
-            st.header("📊 Average Salary by Job Title")
-            result = df.groupby("title")["salary"].mean().reset_index(name="avg_sal")
-            result = result.sort_values(by="avg_sal", ascending=False)
-            plt.figure(figsize=(10, 6))
-            sns.barplot(x="title", y="avg_sal", data=result, hue="title", palette="viridis")
-            plt.title("Average Salary by Job Title", fontsize=16)
-            plt.xlabel("Job Title", fontsize=14)
-            plt.ylabel("Average Salary", fontsize=14)
-            plt.xticks(rotation=45, fontsize=12)
-            plt.yticks(fontsize=12)
-            for index, value in enumerate(result["avg_sal"]):
-                plt.text(index, value + 500, f"{value:.2f}", ha="center", va="bottom", fontsize=12)
-            plt.tight_layout()
-            st.pyplot(plt)
-
-            # Visualization 14: Number of Employees Hired by Year
-            st.header("📊 Number of Employees Hired by Year")
-            df["hire_date"] = pd.to_datetime(df["hire_date"], errors="coerce")
-            df["hire_year"] = df["hire_date"].dt.year
-            result = df.groupby("hire_year").size().reset_index(name="employee_count")
-            result = result.sort_values(by="hire_year")
-            plt.figure(figsize=(10, 6))
-            sns.lineplot(x="hire_year", y="employee_count", data=result, marker="o", color="blue")
-            plt.title("Number of Employees Hired by Year", fontsize=16)
-            plt.xlabel("Year", fontsize=14)
-            plt.ylabel("Number of Employees", fontsize=14)
-            plt.xticks(fontsize=12)
-            plt.yticks(fontsize=12)
-            for index, row in result.iterrows():
-                plt.text(row["hire_year"], row["employee_count"] + 0.1, str(row["employee_count"]), ha="center", va="bottom", fontsize=12)
-            plt.grid(False)
-            plt.tight_layout()
-            st.pyplot(plt)
-
-            # Visualization 15: Number of Exits per Year
-            st.header("📊 Number of Exits per Year")
-            df["last_date"] = pd.to_datetime(df["last_date"], errors="coerce")
-            df_valid = df[df["last_date"].notna()]
-            df_valid["exit_year"] = df_valid["last_date"].dt.year
-            exit_counts = df_valid.groupby("exit_year").agg(total_exits=("emp_no", "count")).reset_index()
-            exit_counts_sorted = exit_counts.sort_values(by="exit_year").reset_index(drop=True)
-            plt.figure(figsize=(6, 4))
-            sns.lineplot(data=exit_counts_sorted, x="exit_year", y="total_exits", marker="o", color="blue")
-            plt.title("Number of Exits per Year", fontsize=16)
-            plt.xlabel("Exit Year", fontsize=12)
-            plt.ylabel("Total Exits", fontsize=12)
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            st.pyplot(plt)
-
-            # Visualization 16: Average Salary by Hire Year
-            st.header("📊 Average Salary by Hire Year")
-            df["hire_date"] = pd.to_datetime(df["hire_date"], errors="coerce")
-            df["hire_year"] = df["hire_date"].dt.year
-            result = df.groupby("hire_year")["salary"].mean().reset_index(name="avg_salary")
-            result = result.sort_values(by="hire_year")
-            plt.figure(figsize=(6, 4))
-            sns.lineplot(data=result, x="hire_year", y="avg_salary", marker="o", color="green")
-            plt.title("Average Salary by Hire Year", fontsize=16)
-            plt.xlabel("Hire Year", fontsize=12)
-            plt.ylabel("Average Salary", fontsize=12)
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            st.pyplot(plt)
-
-            # Visualization 17: Gender Distribution in the Company
-            st.header("📊 Gender Distribution in the Company")
-            female_count = df[df["sex"] == "F"].shape[0]
-            male_count = df[df["sex"] == "M"].shape[0]
-            gender_counts = pd.DataFrame({
-                "gender": ["Female", "Male"],
-                "total_no": [female_count, male_count]
-            })
-            total_count = gender_counts["total_no"].sum()
-            gender_counts["pct"] = (gender_counts["total_no"] * 100) / total_count
-            plt.figure(figsize=(3, 3))
-            plt.pie(gender_counts["total_no"], labels=gender_counts["gender"], autopct="%1.1f%%", startangle=90, colors=["#ff9999", "#66b3ff"])
-            plt.title("Gender Distribution in the Company", fontsize=16)
-            plt.axis("equal")
-            plt.tight_layout()
-            st.pyplot(plt)
+            for row in (KEY_METRICS[:4], KEY_METRICS[4:]):
+                for column, (key, label, value_format) in zip(st.columns(4), row):
+                    with column:
+                        st.metric(label, value_format.format(metrics[key]))
+
+            # Visualizations, one tab per section. Only the open tab's charts are drawn in this
+            # rerun; the other sections are rendered ahead of time by the background workers.
+            tabs = st.tabs(list(CHART_SECTIONS), key="chart_section", on_change="rerun")
+            open_section = next((section for tab, section in zip(tabs, CHART_SECTIONS) if tab.open), None)
+            prerender_sections(open_section, aggregates, version, filters)
+            for tab, (section, chart_ids) in zip(tabs, CHART_SECTIONS.items()):
+                if section == open_section:
+                    with tab, record_stage("display_charts", rows=len(chart_ids)):
+                        for chart_id in chart_ids:
+                            st.header(CHART_HEADERS[chart_id])
+                            st.image(cached_chart_png(chart_id, aggregates, version, filters), width="stretch")
 
     # Close connection
-    if "conn" in st.session_state and st.sidebar.button("Disconnect"):
-        st.session_state.conn.close()
-        del st.session_state.conn
+    if "connected" in st.session_state and st.sidebar.button("Disconnect"):
+        del st.session_state.connected
         st.success("Disconnected from SQL Server.")
 
+    # Performance panel: the stages timed in this rerun (drawn after the page, see __main__)
+    st.sidebar.checkbox("Show performance panel", key="show_performance")
+
+# Sidebar table of the stages timed in this rerun
+def performance_panel(profile):
+    st.sidebar.subheader("⏱️ Performance")
+    st.sidebar.caption(f"Rerun: {profile.total_seconds():.3f}s. Memory deltas are changes in process RSS; an SQL aggregate includes its connect and fetch.")
+    st.sidebar.dataframe(
+        profile.table(),
+        hide_index=True,
+        column_config={
+            "seconds": st.column_config.NumberColumn(format="%.4f"),
+            "memory_delta_mb": st.column_config.NumberColumn("memory Δ (MB)", format="%.1f"),
+        },
+    )
+
+# Function to load the dashboard table from a SQLite database or a Parquet/Arrow snapshot file
+# and compute every aggregate; returns the aggregates, the data's fetch time and the row count
+def load_report_aggregates(source):
+    if source.endswith((".parquet", ".arrow", ".feather")):
+        if pa is None:
+            raise RuntimeError("Reading Parquet/Arrow files requires pyarrow.")
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"No such file: {source}")
+        df, fetched_at = read_snapshot(source)
+        if df is None:
+            raise RuntimeError(f"Could not read snapshot {source}")
+    else:
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"No such file: {source}")
+        with closing(connect_to_sqlite(source)) as conn, closing(execute_query(conn, table_query())) as cursor:
+            df = compact_table(fetch_frame(cursor))
+        fetched_at = time.time()
+    cube = AggregateCube.build(add_derived_columns(df), index_rows=False)
+    return compute_aggregates(cube), fetched_at, len(df)
+
+# Function to draw every chart, spread over worker processes (matplotlib is not thread-safe);
+# returns the images by chart id, in page order
+def render_report_charts(aggregates, image_format, workers):
+    chart_ids = list(CHART_BUILDERS)
+    with record_stage("render_charts", rows=len(chart_ids)):
+        if workers <= 1:
+            images = [render_chart(chart_id, aggregates, image_format) for chart_id in chart_ids]
+        else:
+            render = dashboard_module().render_chart
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(min(workers, len(chart_ids)), mp_context=context) as executor:
+                images = list(executor.map(render, chart_ids, [aggregates] * len(chart_ids), [image_format] * len(chart_ids)))
+    return dict(zip(chart_ids, images))
+
+# Function to lay out the Key Metrics and every section's charts as one self-contained HTML page
+def build_report_html(aggregates, images, image_format, source, fetched_at):
+    metrics = key_metrics(aggregates)
+    mime = "image/svg+xml" if image_format == "svg" else "image/png"
+    data_as_of = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(fetched_at))
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="utf-8">',
+        "<title>Employee Data Report</title>",
+        "<style>",
+        "body { font-family: sans-serif; max-width: 1100px; margin: 2em auto; color: #262730; }",
+        ".metrics { display: grid; grid-template-columns: repeat(4, 1fr); gap: 1em; }",
+        ".metric { border: 1px solid #ddd; border-radius: 6px; padding: 0.6em; }",
+        ".metric .label { font-size: 0.85em; color: #666; } .metric .value { font-size: 1.4em; }",
+        "img { max-width: 100%; }",
+        "</style></head><body>",
+        "<h1>📊 Employee Data Report</h1>",
+        f"<p>Source: {html.escape(source)}<br>Data as of {data_as_of}. Generated {time.strftime('%Y-%m-%d %H:%M:%S')}.</p>",
+        "<h2>📈 Key Metrics</h2>",
+        '<div class="metrics">',
+    ]
+    for key, label, value_format in KEY_METRICS:
+        value = html.escape(value_format.format(metrics[key]))
+        parts.append(f'<div class="metric"><div class="label">{html.escape(label)}</div><div class="value">{value}</div></div>')
+    parts.append("</div>")
+    for section, chart_ids in CHART_SECTIONS.items():
+        parts.append(f"<h2>{html.escape(section)}</h2>")
+        for chart_id in chart_ids:
+            encoded = base64.b64encode(images[chart_id]).decode("ascii")
+            parts.append(f"<h3>{html.escape(CHART_HEADERS[chart_id])}</h3>")
+            parts.append(f'<img alt="{html.escape(CHART_HEADERS[chart_id])}" src="data:{mime};base64,{encoded}">')
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+# Headless batch report: `python python.py --source data.db --output report.html` writes every chart
+# and the Key Metrics to one static HTML file, without Streamlit or the login page
+def report_main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the dashboard as a static HTML report.")
+    parser.add_argument("--source", required=True, help=f"SQLite database with a {TABLE_NAME} table, or a .parquet/.arrow snapshot file")
+    parser.add_argument("--output", default="report.html", help="HTML file to write")
+    parser.add_argument("--format", choices=["png", "svg"], default="png", help="image format of the embedded charts")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes rendering charts (1 renders in this process)")
+    args = parser.parse_args(argv)
+
+    # Streamlit calls made outside `streamlit run` only log warnings about the missing runtime
+    st.logger.set_log_level("error")
+    started = time.perf_counter()
+    with profile_rerun():
+        try:
+            aggregates, fetched_at, rows = load_report_aggregates(args.source)
+        except Exception as e:
+            print(f"Error loading {args.source}: {e}", file=sys.stderr)
+            return 1
+        images = render_report_charts(aggregates, args.format, args.workers)
+        with record_stage("write_report"):
+            report = build_report_html(aggregates, images, args.format, args.source, fetched_at)
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(report)
+    print(f"Wrote {args.output}: {len(images)} charts from {rows:,} rows in {time.perf_counter() - started:.1f}s")
+    return 0
+
 # Run the app
 if __name__ == "__main__":
+    # Run as a plain script (no Streamlit runtime), write the static report instead
+    if not st.runtime.exists():
+        sys.exit(report_main())
+
     # Check if the user is logged in
     if "logged_in" not in st.session_state:
         st.session_state.logged_in = False
@@ -436,4 +2835,7 @@ if __name__ == "__main__":
     if not st.session_state.logged_in:
         login_page()
     else:
-        main_dashboard()
+        with profile_rerun() as profile:
+            main_dashboard()
+            if st.session_state.get("show_performance"):
+                performance_panel(profile)
@@ -0,0 +1,56 @@
+# Test data shared by the test modules: a synthetic final_table, in an in-memory SQLite database
+# and as an aggregate cube
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+# Employees with repeated rows (a title change), missing salaries, dates and ratings, and a
+# salary at each bin edge
+def synthetic_table(rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    hire = pd.Timestamp("1985-01-01") + pd.to_timedelta(rng.integers(0, 5000, rows), unit="D")
+    last = hire + pd.to_timedelta(rng.integers(100, 4000, rows), unit="D")
+    left = rng.random(rows) < 0.3
+    df = pd.DataFrame({
+        "emp_no": np.arange(10001, 10001 + rows),
+        "title": rng.choice(["Engineer", "Senior Engineer", "Staff", "Manager"], rows),
+        "salary": rng.integers(38000, 131000, rows).astype(float),
+        "sex": rng.choice(["M", "F"], rows),
+        "left": left.astype(int),
+        "hire_date": hire.strftime("%Y-%m-%d"),
+        "last_date": np.where(left, last.strftime("%Y-%m-%d"), None),
+        "birth_date": (hire - pd.to_timedelta(rng.integers(20 * 365, 45 * 365, rows), unit="D")).strftime("%Y-%m-%d"),
+        "Last_performance_rating": rng.choice(["A", "B", "C", "PIP", "S"], rows),
+    })
+    df.loc[:13, "salary"] = [40000, 60000, 60001, 80000, 80001, 100000, 100001, 129492, 129493, 39999, np.nan, np.nan, 40000, 129493]
+    df.loc[rng.choice(rows, 10, replace=False), "hire_date"] = None
+    df.loc[rng.choice(rows, 10, replace=False), "Last_performance_rating"] = None
+    repeated = df.sample(60, random_state=seed).assign(title="Senior Staff")
+    repeated.loc[repeated.index[:10], "salary"] = np.nan
+    return pd.concat([df, repeated]).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+@pytest.fixture(scope="module")
+def table():
+    return synthetic_table()
+
+# The table in an in-memory SQLite database
+@pytest.fixture(scope="module")
+def database(table):
+    conn = sqlite3.connect(":memory:")
+    table.to_sql(dashboard.TABLE_NAME, conn, index=False)
+    yield conn
+    conn.close()
+
+# The aggregate cube built from the database's table
+@pytest.fixture(scope="module")
+def cube(database):
+    df = dashboard.compact_table(pd.read_sql(dashboard.table_query(), database))
+    return dashboard.AggregateCube.build(dashboard.add_derived_columns(df))
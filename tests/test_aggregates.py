@@ -0,0 +1,71 @@
+# Checks of the vectorized derived columns
+#
+#   python -m pytest tests
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+# The per-row bucketers the dashboard used before bucketize
+def get_salary_range(salary):
+    if 40000 <= salary <= 60000:
+        return "40k-60k"
+    elif 60001 <= salary <= 80000:
+        return "60k-80k"
+    elif 80001 <= salary <= 100000:
+        return "80k-100k"
+    elif 100001 <= salary <= 129492:
+        return "100k-130k"
+    else:
+        return "Unknown"
+
+def tenure_group(tenure):
+    if 1 <= tenure <= 4:
+        return "Low Tenure(>=1 to <=4)"
+    elif 4 < tenure <= 8:
+        return "Medium Tenure(>4 to <=8)"
+    else:
+        return "High Tenure(>8 to <=14)"
+
+def age_group(age):
+    if 21 <= age <= 30:
+        return "21-30"
+    elif 30 < age <= 40:
+        return "31-40"
+    elif 40 < age <= 50:
+        return "41-50"
+    elif 50 < age <= 60:
+        return "51-60"
+    else:
+        return ">60"
+
+@pytest.mark.parametrize("values, bucketer, bins, default", [
+    (
+        [39999, 40000, 59999.5, 60000, 60000.5, 60001, 80000, 80001, 100000, 100001, 129492, 129492.5, 129493, np.nan],
+        get_salary_range,
+        dashboard.SALARY_RANGE_BINS,
+        dashboard.SALARY_RANGE_DEFAULT,
+    ),
+    (
+        [0, 0.99, 1, 4, 4.001, 8, 8.001, 14, 20, np.nan],
+        tenure_group,
+        dashboard.TENURE_GROUP_BINS,
+        dashboard.TENURE_GROUP_DEFAULT,
+    ),
+    (
+        [20, 20.99, 21, 30, 30.001, 40, 40.5, 50, 60, 60.001, 75, np.nan],
+        age_group,
+        dashboard.AGE_GROUP_BINS,
+        dashboard.AGE_GROUP_DEFAULT,
+    ),
+])
+def test_bucketize_matches_apply(values, bucketer, bins, default):
+    values = pd.Series(values, dtype=float)
+    expected = values.apply(bucketer).tolist()
+    assert np.asarray(dashboard.bucketize(values, bins, default)).tolist() == expected
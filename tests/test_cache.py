@@ -0,0 +1,124 @@
+# Checks of the shared query cache: expiry, eviction, single-flight loading, reloads and size accounting
+#
+#   python -m pytest tests
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+def frame(values):
+    return pd.DataFrame({"emp_no": values, "salary": [value * 1000 for value in values]})
+
+def test_expired_entry_is_missed_but_kept():
+    cache = dashboard.QueryCache(0, 1000)
+    entry = cache.put("a", "value", 10)
+    assert cache.get("a") is None
+    assert cache.peek("a") is entry
+    assert cache.get_or_load("a", lambda previous: ("new", {}), len, stale_ok=True) is entry
+
+def test_entry_is_served_until_it_expires():
+    cache = dashboard.QueryCache(60, 1000)
+    entry = cache.put("a", "value", 10)
+    assert cache.get("a") is entry
+    entry.expires_at = time.time() - 1
+    assert cache.get("a") is None
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = dashboard.QueryCache(60, 100)
+    cache.put("a", "a", 40)
+    cache.put("b", "b", 40)
+    cache.get("a")
+    cache.put("c", "c", 40)
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None and cache.peek("c") is not None
+    assert cache.total_bytes == 80
+
+def test_entry_larger_than_the_cache_is_not_kept():
+    cache = dashboard.QueryCache(60, 100)
+    cache.put("a", "a", 40)
+    entry = cache.put("big", "big", 101)
+    assert entry.value == "big"
+    assert cache.peek("big") is None
+    assert cache.total_bytes == 40
+
+def test_concurrent_misses_load_once():
+    cache = dashboard.QueryCache(60, 1000)
+    calls = []
+    started = threading.Barrier(8)
+    results = []
+
+    def loader(previous):
+        calls.append(previous)
+        time.sleep(0.2)
+        return "value", {}
+
+    def load():
+        started.wait()
+        results.append(cache.get_or_load("a", loader, len))
+
+    threads = [threading.Thread(target=load) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len({id(entry) for entry in results}) == 1
+    assert cache._key_locks == {}
+
+def test_failed_load_is_not_cached():
+    cache = dashboard.QueryCache(60, 1000)
+    assert cache.get_or_load("a", lambda previous: (None, {}), len) is None
+    assert cache.peek("a") is None
+    assert cache._key_locks == {}
+
+def test_reload_with_the_same_content_keeps_the_version():
+    cache = dashboard.QueryCache(60, 10 ** 6)
+    entry = cache.get_or_load("a", lambda previous: (frame([1, 2, 3]), {}), dashboard.frame_size)
+    entry.expires_at = time.time() - 1
+    # Same rows in another order, then the previous frame itself (an incremental load without changes)
+    reloaded = cache.get_or_load("a", lambda previous: (frame([3, 1, 2]), {"fetched_at": 5.0}), dashboard.frame_size)
+    assert reloaded is entry and reloaded.fetched_at == 5.0
+    assert cache.get("a") is entry
+    reloaded = cache.get_or_load("a", lambda previous: (previous.value, {}), dashboard.frame_size, force=True)
+    assert reloaded is entry
+
+def test_reload_with_new_content_replaces_the_entry():
+    cache = dashboard.QueryCache(60, 10 ** 6)
+    entry = cache.get_or_load("a", lambda previous: (frame([1, 2, 3]), {}), dashboard.frame_size)
+    reloaded = cache.get_or_load("a", lambda previous: (frame([1, 2, 4]), {}), dashboard.frame_size, force=True)
+    assert reloaded is not entry and reloaded.version > entry.version
+    assert cache.total_bytes == reloaded.size
+
+def test_mapped_value_always_replaces_the_entry():
+    assert not dashboard.same_content(dashboard.CacheEntry(frame([1]), 0, 0, 0, {}), frame([1]), {"path": "v2.arrow"})
+
+def test_derived_values_count_towards_the_cap():
+    cache = dashboard.QueryCache(60, 1000)
+    entry = cache.put("a", "a", 100)
+    cache.put("b", "b", 100)
+    entry.derived("codes", lambda value: np.zeros(500, dtype=np.int8))
+    assert entry.size == 600
+    assert cache.total_bytes == 700
+    # Reading a derived value again adds nothing
+    entry.derived("codes", lambda value: np.zeros(500, dtype=np.int8))
+    assert cache.total_bytes == 700
+    # Growing past the cap evicts the least recently used entry
+    cache.get("a")
+    entry.derived("more", lambda value: np.zeros(350, dtype=np.int8))
+    assert cache.peek("b") is None
+    assert cache.total_bytes == entry.size == 950
+
+def test_removed_entry_no_longer_counts_its_growth():
+    cache = dashboard.QueryCache(60, 1000)
+    entry = cache.put("a", "a", 100)
+    cache.invalidate(lambda key: True)
+    entry.derived("codes", lambda value: np.zeros(50, dtype=np.int8))
+    assert entry.size == 150
+    assert cache.total_bytes == 0
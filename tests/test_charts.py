@@ -0,0 +1,37 @@
+# Checks of the chart builders
+#
+#   python -m pytest tests
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+@pytest.mark.parametrize("chart_id", list(dashboard.CHART_BUILDERS))
+def test_chart_draws_from_its_inputs(cube, chart_id):
+    aggregates = dashboard.compute_aggregates(cube)
+    assert dashboard.render_chart_png(chart_id, dashboard.chart_inputs(chart_id, aggregates)) == dashboard.render_chart_png(chart_id, aggregates)
+
+# The test table plus a title nobody with it has left, so selecting it leaves every leaver chart empty
+@pytest.fixture(scope="module")
+def cube_with_stayers(table):
+    stayers = table.sample(20, random_state=2).assign(emp_no=lambda rows: rows["emp_no"] + 100000, title="Intern", left=0, last_date=None)
+    df = dashboard.compact_table(pd.concat([table, stayers], ignore_index=True))
+    return dashboard.AggregateCube.build(dashboard.add_derived_columns(df))
+
+# Selections that leave some charts without data: nobody who left, a title without leavers, and
+# one no employee matches
+@pytest.mark.parametrize("filters", [
+    (("left", (0,)),),
+    (("title", ("Intern",)),),
+    (("title", ("Intern",)), ("left", (1,))),
+])
+def test_every_chart_draws_a_selection_without_data(cube_with_stayers, filters):
+    aggregates = dashboard.compute_aggregates(cube_with_stayers, filters)
+    assert not len(aggregates["attrition_by_tenure_group"])
+    for chart_id in dashboard.CHART_BUILDERS:
+        assert dashboard.render_chart_png(chart_id, aggregates).startswith(b"\x89PNG")
@@ -0,0 +1,18 @@
+# Checks of the aggregate cube: every visualization aggregate equals the one the SQL query computes
+#
+#   python -m pytest tests
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+def test_cube_matches_sql(database, cube):
+    expected = dashboard.split_aggregates(pd.read_sql(dashboard.build_aggregates_sql("sqlite"), database))
+    aggregates = dashboard.compute_aggregates(cube)
+    assert aggregates.keys() == expected.keys()
+    for name in expected:
+        pd.testing.assert_frame_equal(aggregates[name], expected[name], check_dtype=False, obj=name)
@@ -0,0 +1,31 @@
+# Checks of the sidebar filters: the cube's aggregates for a filter selection equal the SQL query's
+# with the same WHERE clause
+#
+#   python -m pytest tests
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+FILTER_SELECTIONS = [
+    (("title", ("Senior Staff", "Manager")),),
+    (("left", (1,)), ("sex", ("F",))),
+    (("left", (0,)),),
+    (("salary_range", ("40k-60k", "Unknown")), ("Last_performance_rating", ("A", "B"))),
+    (("title", ()),),
+]
+
+@pytest.mark.parametrize("filters", FILTER_SELECTIONS)
+def test_filtered_cube_matches_sql(database, cube, filters):
+    result = pd.read_sql(dashboard.build_aggregates_sql("sqlite", filters=filters), database)
+    expected = dashboard.split_aggregates(result)
+    aggregates = dashboard.compute_aggregates(cube, filters)
+    assert aggregates.keys() == expected.keys()
+    for name in expected:
+        if len(expected[name]) or len(aggregates[name]):
+            pd.testing.assert_frame_equal(aggregates[name], expected[name], check_dtype=False, obj=name)
@@ -0,0 +1,43 @@
+# Checks of the incremental refresh: a delta load merged into the previous table equals a full reload
+#
+#   python -m pytest tests
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+def sorted_rows(df):
+    return df.sort_values(["emp_no", "title", "salary"], na_position="first", kind="stable").reset_index(drop=True)
+
+def test_delta_load_matches_full_reload(table, tmp_path):
+    path = str(tmp_path / "employees.db")
+    with closing(sqlite3.connect(path)) as conn:
+        table.to_sql(dashboard.TABLE_NAME, conn, index=False)
+    pool = dashboard.ConnectionPool(dashboard.connection_factory("sqlite", path), 2, 60, 5)
+    query = dashboard.table_query()
+    df, info = dashboard.load_table_incremental(pool, query, None)
+    previous = dashboard.CacheEntry(df, dashboard.frame_size(df), time.time(), time.time(), info)
+
+    # An employee leaves on the day of the current last_date watermark (a date compared as text or
+    # with > would miss it), and a new employee is hired
+    last_day = info["watermark"]["last_date"]
+    staying = int(table.loc[table["left"] == 0, "emp_no"].iloc[0])
+    new_hire = table.iloc[[0]].assign(emp_no=info["watermark"]["emp_no"] + 1, left=0, last_date=None, hire_date=last_day)
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute(f"UPDATE {dashboard.TABLE_NAME} SET [left] = 1, [last_date] = ?, [salary] = 99999 WHERE [emp_no] = ?", (last_day, staying))
+        new_hire.to_sql(dashboard.TABLE_NAME, conn, index=False, if_exists="append")
+        conn.commit()
+
+    merged, merged_info = dashboard.load_table_incremental(pool, query, previous)
+    reloaded, reloaded_info = dashboard.load_table_incremental(pool, query, None)
+    pool.close()
+    assert 0 < merged_info["delta_rows"] < len(reloaded)
+    assert merged_info["watermark"] == reloaded_info["watermark"]
+    pd.testing.assert_frame_equal(sorted_rows(merged), sorted_rows(reloaded))
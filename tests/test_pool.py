@@ -0,0 +1,98 @@
+# Checks of the connection pool against SQLite: size limit, checkout timeout, reconnects, idle expiry
+# and returning connections however a block exits
+#
+#   python -m pytest tests
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+# Factory of in-memory SQLite connections that keeps every connection it opened
+class Connections:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        conn = dashboard.connect_to_sqlite(":memory:")
+        self.opened.append(conn)
+        return conn
+
+def make_pool(max_size=2, idle_timeout=60, checkout_timeout=5):
+    connections = Connections()
+    return dashboard.ConnectionPool(connections, max_size, idle_timeout, checkout_timeout), connections
+
+def test_checkout_waits_for_a_free_connection_up_to_the_timeout():
+    pool, connections = make_pool(max_size=2, checkout_timeout=0.2)
+    first, second = pool.checkout(), pool.checkout()
+    started = time.time()
+    with pytest.raises(TimeoutError):
+        pool.checkout()
+    assert time.time() - started >= 0.2
+    assert len(connections.opened) == 2
+    pool.checkin(first)
+    assert pool.checkout() is first
+    pool.checkin(first)
+    pool.checkin(second)
+    pool.close()
+
+def test_dropped_connection_is_reopened_on_checkout():
+    pool, connections = make_pool(max_size=1)
+    conn = pool.checkout()
+    pool.checkin(conn)
+    conn.close()
+    reopened = pool.checkout()
+    assert reopened is not conn
+    assert pool.is_alive(reopened)
+    assert len(connections.opened) == 2
+    pool.checkin(reopened)
+    pool.close()
+
+def test_idle_connections_are_closed_without_further_use():
+    pool, connections = make_pool(max_size=3, idle_timeout=0.2)
+    conns = [pool.checkout() for _ in range(3)]
+    for conn in conns:
+        pool.checkin(conn)
+    time.sleep(0.6)
+    assert not any(pool.is_alive(conn) for conn in conns)
+    assert pool._idle == [] and pool._open == 0
+    # The pool keeps working after its idle connections were closed
+    with pool.connection() as conn:
+        assert pool.is_alive(conn)
+    pool.close()
+
+def test_expired_connections_are_closed_on_checkin():
+    pool, connections = make_pool(max_size=2, idle_timeout=0.2)
+    idle, busy = pool.checkout(), pool.checkout()
+    pool.checkin(idle)
+    pool._idle = [(idle, time.time() - 1)]
+    pool.checkin(busy)
+    assert not pool.is_alive(idle)
+    assert [conn for conn, last_used in pool._idle] == [busy]
+    pool.close()
+
+# Raised like Streamlit's stop/rerun exceptions, which do not derive from Exception
+class Rerun(BaseException):
+    pass
+
+def test_connection_is_returned_when_the_block_raises():
+    pool, connections = make_pool(max_size=1, checkout_timeout=0.2)
+    with pytest.raises(Rerun):
+        with pool.connection() as conn:
+            raise Rerun()
+    with pool.connection() as again:
+        assert again is conn
+
+def test_dead_connection_frees_its_slot_when_the_block_raises():
+    pool, connections = make_pool(max_size=1, checkout_timeout=0.2)
+    with pytest.raises(Rerun):
+        with pool.connection() as conn:
+            conn.close()
+            raise Rerun()
+    assert pool._open == 0
+    with pool.connection() as again:
+        assert again is not conn and pool.is_alive(again)
@@ -0,0 +1,46 @@
+# Checks of the shared dataset: a published version maps back read-only as the same aggregate cube,
+# rollup plans included
+#
+#   python -m pytest tests
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+from test_filters import FILTER_SELECTIONS
+
+@pytest.fixture(scope="module")
+def derived_table(database):
+    df = dashboard.compact_table(pd.read_sql(dashboard.table_query(), database))
+    return dashboard.add_derived_columns(df)
+
+@pytest.fixture(scope="module")
+def mapped_cube(derived_table, tmp_path_factory):
+    dataset = dashboard.SharedDataset(str(tmp_path_factory.mktemp("shared")), "employees")
+    return dataset.attach(dataset.publish(derived_table, 0.0))
+
+@pytest.mark.parametrize("filters", [()] + FILTER_SELECTIONS)
+def test_mapped_cube_matches_in_memory_cube(cube, mapped_cube, filters):
+    expected = dashboard.compute_aggregates(cube, filters)
+    aggregates = dashboard.compute_aggregates(mapped_cube, filters)
+    assert aggregates.keys() == expected.keys()
+    for name in expected:
+        pd.testing.assert_frame_equal(aggregates[name], expected[name], check_dtype=False, obj=name)
+
+def test_mapped_cube_is_read_only(mapped_cube):
+    bitmaps = [bitmap for values in mapped_cube.row_index.bitmaps.values() for bitmap in values.values()]
+    codes = [array for column in mapped_cube.row_values.values() for array in column]
+    plans = [codes for codes, keys in mapped_cube._plans.values()] + list(mapped_cube._measures.values())
+    assert bitmaps and codes and plans
+    assert not any(array.flags.writeable for array in bitmaps + codes + plans)
+
+def test_publishing_the_same_table_keeps_the_version(derived_table, tmp_path):
+    dataset = dashboard.SharedDataset(str(tmp_path), "employees")
+    path = dataset.publish(derived_table, 0.0)
+    assert dataset.publish(derived_table.copy(), 1.0) == path
+    assert sorted(os.listdir(tmp_path)) == sorted(["employees.current", os.path.basename(path)])
@@ -0,0 +1,29 @@
+# Checks of the aggregates the SQL query computes on the server: salary bins and the first row per employee
+#
+#   python -m pytest tests
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+def test_salary_histogram_matches_numpy(database, cube):
+    salaries = pd.read_sql(f"SELECT [salary] FROM {dashboard.TABLE_NAME}", database)["salary"].dropna()
+    counts, edges = np.histogram(salaries, bins=5)
+    histogram = dashboard.compute_aggregates(cube)["salary_histogram"]
+    assert histogram["n"].tolist() == counts[histogram["salary_bin"]].tolist()
+    assert histogram["n"].sum() == counts.sum()
+    fig = dashboard.chart_salary_distribution({"salary_histogram": histogram})
+    assert [patch.get_height() for patch in fig.axes[0].patches] == counts.tolist()
+    assert np.allclose([patch.get_x() for patch in fig.axes[0].patches], edges[:-1])
+
+def test_first_row_of_employee_is_first_in_order(cube, database):
+    df = pd.read_sql(dashboard.table_query(), database)
+    first = df.sort_values(["emp_no"] + dashboard.FIRST_ROW_ORDER, na_position="first", kind="stable").drop_duplicates("emp_no")
+    expected = first.groupby("title")["salary"].mean()
+    result = dashboard.compute_aggregates(cube)["avg_salary_by_title_unique"].set_index("title")["salary"]
+    pd.testing.assert_series_equal(result.sort_index(), expected.sort_index(), check_names=False, check_index_type=False)
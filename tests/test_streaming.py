@@ -0,0 +1,49 @@
+# Checks of the streamed load: the cube folded chunk by chunk equals the cube of the whole table
+#
+#   python -m pytest tests
+import os
+import sqlite3
+import sys
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import python as dashboard
+
+# The shared test table plus rows without an emp_no, which the stream returns first
+@pytest.fixture(scope="module")
+def streamed_database(table, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("streaming") / "employees.db")
+    missing = table.sample(9, random_state=1).assign(emp_no=None)
+    with closing(sqlite3.connect(path)) as conn:
+        pd.concat([table, missing], ignore_index=True).to_sql(dashboard.TABLE_NAME, conn, index=False)
+    return path
+
+# Chunks small enough to split employees' rows and the missing emp_no rows, and merges every few chunks
+@pytest.mark.parametrize("chunk_rows", [4, 7, 1000])
+def test_streamed_cube_matches_in_memory_cube(streamed_database, monkeypatch, chunk_rows):
+    monkeypatch.setattr(dashboard, "STREAM_CHUNK_ROWS", chunk_rows)
+    monkeypatch.setattr(dashboard, "STREAM_MERGE_BATCH", 3)
+    pool = dashboard.ConnectionPool(dashboard.connection_factory("sqlite", streamed_database), 1, 60, 5)
+    streamed, info = dashboard.load_table_streaming(pool, dashboard.streaming_query())
+    with pool.connection() as conn:
+        df = dashboard.compact_table(pd.read_sql(dashboard.table_query(), conn))
+    pool.close()
+    assert info["rows"] == len(df)
+    expected = dashboard.compute_aggregates(dashboard.AggregateCube.build(dashboard.add_derived_columns(df)))
+    aggregates = dashboard.compute_aggregates(streamed)
+    assert aggregates.keys() == expected.keys()
+    for name in expected:
+        pd.testing.assert_frame_equal(aggregates[name], expected[name], check_dtype=False, obj=name)
+
+def test_seen_employees_keeps_only_the_last_employee():
+    seen = dashboard.SeenEmployees()
+    assert not seen.contains(pd.Series([1.0, np.nan])).any()
+    seen.add(pd.Series([np.nan, np.nan]))
+    assert seen.contains(pd.Series([np.nan, 1.0])).tolist() == [True, False]
+    seen.add(pd.Series([1, 2_000_000_000]))
+    assert seen.contains(pd.Series([np.nan, 1, 2_000_000_000])).tolist() == [False, False, True]